@@ -1,14 +1,35 @@
 # app.py - Main application file with Authentication
 import streamlit as st
+import pandas as pd
 from datetime import datetime
 import sys
 from pathlib import Path
 import asyncio
 from simple_auth import SimpleAuth
 import os
+import logging
 
-# Add src directory to path for imports
-sys.path.append(str(Path(__file__).parent / "src"))
+# Level-gated logger - debug diagnostics cost nothing unless DBA_BOT_LOG=DEBUG
+logger = logging.getLogger("dba_bot")
+logger.setLevel(os.getenv("DBA_BOT_LOG", "INFO"))
+
+# How many chat messages are rendered inline; older ones go in an expander
+_HISTORY_WINDOW = 20
+
+# Shared Plotly toolbar config - built once instead of per rendered message
+_PLOTLY_CONFIG = {
+    'displayModeBar': True,  # Show toolbar with fullscreen option
+    'displaylogo': False,
+    'modeBarButtonsToRemove': (
+        'pan2d', 'lasso2d', 'select2d', 'autoScale2d'
+    )
+}
+
+# Add src directory to path for imports (idempotent - Streamlit re-executes
+# this module, and repeated appends would keep growing sys.path)
+_SRC = str(Path(__file__).parent / "src")
+if _SRC not in sys.path:
+    sys.path.insert(0, _SRC)
 
 try:
     from intelligent_live_query import LiveQueryChatbot
@@ -16,6 +37,14 @@ except ImportError as e:
     st.error(f"Could not import live query system: {e}")
     st.stop()
 
+# Excel export is optional - import once at module load instead of inside the
+# pending-query block and the chat-history render loop
+try:
+    from src.excel_exporter import ExcelExporter, should_show_excel_export
+    _HAS_EXCEL = True
+except ImportError:
+    _HAS_EXCEL = False
+
 # ── BASIC PAGE CONFIG ─────────────────────────────────────────────────────────
 st.set_page_config(
     page_title="DBA BOT",
@@ -25,7 +54,9 @@ st.set_page_config(
 )
 
 # ── CUSTOM CSS ────────────────────────────────────────────────────────────────
-st.markdown("""
+# All app styling lives in one constant; building/serializing the blob is done
+# once per process via _inject_css instead of on every rerun.
+_CSS = """
 <style>
     /* Main header styling */
     .main-header {
@@ -121,146 +152,212 @@ st.markdown("""
         margin-bottom: 2rem;
     }
     
-    /* Chat container styling */
-    .chat-container {
-        max-height: 500px;
-        overflow-y: auto;
-        padding: 1rem;
-        border: 1px solid #e0e0e0;
-        border-radius: 10px;
-        margin-bottom: 1rem;
-        background: #fafafa;
-    }
-    .user-message {
-        background: #e3f2fd;
-        border-left: 4px solid #2196f3;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        border-radius: 8px;
-        margin-left: 2rem;
-        color: black;
+    .input-disabled {
+        pointer-events: none;
+        opacity: 0.6;
     }
-    .assistant-message {
-        background: #f1f8e9;
-        border-left: 4px solid #4caf50;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        border-radius: 8px;
-        margin-right: 2rem;
-        color: black;
+
+    /* Sidebar logout button styling */
+    .stButton[data-testid="baseButton-secondary"] > button {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
+        color: white !important;
+        border: none !important;
+        border-radius: 8px !important;
+        padding: 8px 16px !important;
+        font-weight: 600 !important;
+        transition: all 0.3s ease !important;
+        width: 100% !important;
+        box-shadow: 0 2px 8px rgba(102, 126, 234, 0.3) !important;
     }
-    
-    /* Enhanced styling for messages with embedded graphs */
-    .message-with-graph {
-        background: #f1f8e9;
-        border-left: 4px solid #4caf50;
-        padding: 1rem;
-        margin: 0.5rem 0;
-        border-radius: 8px;
-        margin-right: 2rem;
-        color: black;
+
+    .stButton[data-testid="baseButton-secondary"] > button:hover {
+        transform: translateY(-1px) !important;
+        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.5) !important;
+        background: linear-gradient(135deg, #5a6fd8 0%, #6a4c93 100%) !important;
     }
-    
-    /* Graph container inside message */
-    .graph-container {
-        margin-top: 1rem;
-        padding: 0.5rem;
-        background: rgba(255, 255, 255, 0.3);
-        border-radius: 6px;
-        border: 1px solid rgba(76, 175, 80, 0.3);
+
+    /* Alternative selector for sidebar buttons */
+    div[data-testid="stSidebar"] .stButton > button {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
+        color: white !important;
+        border: none !important;
+        border-radius: 8px !important;
+        padding: 8px 16px !important;
+        font-weight: 600 !important;
+        transition: all 0.3s ease !important;
+        width: 100% !important;
+        box-shadow: 0 2px 8px rgba(102, 126, 234, 0.3) !important;
     }
-    
-    .input-disabled {
-        pointer-events: none;
-        opacity: 0.6;
+
+    div[data-testid="stSidebar"] .stButton > button:hover {
+        transform: translateY(-1px) !important;
+        box-shadow: 0 4px 12px rgba(102, 126, 234, 0.5) !important;
+        background: linear-gradient(135deg, #5a6fd8 0%, #6a4c93 100%) !important;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+@st.cache_resource
+def _inject_css():
+    """Return the app CSS blob (cached once per process)"""
+    return _CSS
 
-# Initialize session state variables
-if "live_processing_query" not in st.session_state:
-    st.session_state.live_processing_query = False
-if "live_pending_question" not in st.session_state:
-    st.session_state.live_pending_question = None
+# ── SHARED RESOURCES ──────────────────────────────────────────────────────────
+# Heavy objects are cached once per server process and shared across sessions,
+# so new browser sessions don't pay the full initialization cost again.
+
+@st.cache_resource(show_spinner="🔧 Initializing live query system...")
+def get_live_chatbot():
+    """Return the process-wide LiveQueryChatbot singleton"""
+    return LiveQueryChatbot()
+
+@st.cache_resource
+def get_excel_exporter():
+    """Return the process-wide ExcelExporter singleton"""
+    return ExcelExporter()
+
+def get_event_loop():
+    """Return this session's persistent event loop.
+
+    Per-session (not st.cache_resource): a process-wide loop driven by
+    run_until_complete from several sessions' script threads raises
+    "This event loop is already running" for whichever user asks second.
+    The loop still outlives individual messages, so warm connections
+    survive across a session's questions.
+    """
+    if "loop" not in st.session_state:
+        st.session_state.loop = asyncio.new_event_loop()
+    return st.session_state.loop
+
+def _hash_results(query_results):
+    """Stable fingerprint of a result set for Excel-export cache keys"""
+    parts = []
+    for r in query_results:
+        if r.success and r.data is not None and not r.data.empty:
+            df_hash = pd.util.hash_pandas_object(r.data, index=True).values.tobytes()
+            parts.append((r.server_name, r.table_name, df_hash))
+    return hash(tuple(parts))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _cached_excel_export(results_key, question, _query_results):
+    """Build the Excel export payload once per (result fingerprint, question).
+
+    _query_results carries the actual data but is excluded from the cache key
+    (leading underscore), so re-asking the same question against unchanged
+    results skips the workbook rebuild entirely. Returns the payload (bytes +
+    metadata), not a component id: the cache is process-global while the
+    export store is per-session, so the caller stores the payload into its
+    own session on every hit.
+    """
+    if not should_show_excel_export(_query_results):
+        return None
+    return get_excel_exporter().build_export_payload(_query_results, question)
+
+def _new_live_state():
+    """Fresh per-session chat state (a factory, not a shared constant, so the
+    history list is never aliased between sessions)"""
+    return {
+        "processing": False,
+        "pending": None,
+        "history": [
+            {
+                'role': 'assistant',
+                'content': "Hi there, ask me anything!"
+            }
+        ],
+    }
+
+# Initialize session state - all chat flags live in one dict so each access
+# afterwards is a plain dict lookup instead of a SessionStateProxy round-trip
+live = st.session_state.setdefault("live", _new_live_state())
 
 # Handle pending questions that need processing
-if st.session_state.live_processing_query and st.session_state.live_pending_question:
+if live["processing"] and live["pending"]:
     # Initialize chatbot and get response with spinner
-    if "live_chatbot" not in st.session_state:
-        try:
-            with st.spinner("🔧 Initializing live query system..."):
-                st.session_state.live_chatbot = LiveQueryChatbot()
-        except Exception as e:
-            st.session_state.live_chat_history.append({
-                'role': 'assistant',
-                'content': f"❌ Error initializing live query system: {str(e)}",
-                'graph': None
-            })
-            st.session_state.live_processing_query = False
-            st.session_state.live_pending_question = None
-            st.rerun()
-    
+    try:
+        live_chatbot = get_live_chatbot()
+    except Exception as e:
+        live["history"].append({
+            'role': 'assistant',
+            'content': f"❌ Error initializing live query system: {str(e)}",
+            'graph': None
+        })
+        live["processing"] = False
+        live["pending"] = None
+        st.rerun()
+
     # Get with spinner
     try:
         with st.spinner("processing..."):
-            response = asyncio.run(st.session_state.live_chatbot.chat(st.session_state.live_pending_question))
-        
+            # chat() hands back the results that produced this answer; the
+            # chatbot is a process-wide singleton, so reading them off a
+            # shared attribute would race with other sessions
+            response, query_results = get_event_loop().run_until_complete(
+                live_chatbot.chat(live["pending"]))
+
         # Check for graph requests and Excel export
         graph_fig = None
         excel_html = None
-        
+
         try:
-            # Get query results from the chatbot's last execution
-            query_results = None
-            if hasattr(st.session_state.live_chatbot.query_system, '_last_query_results'):
-                query_results = st.session_state.live_chatbot.query_system._last_query_results
-            
             # Graph visualization disabled for Streamlit Cloud deployment
             # Users can still request visual data in table format
             
             # Handle Excel export for results with > 2 rows (in-memory)
             excel_component_id = None
             try:
-                from src.excel_exporter import should_show_excel_export, ExcelExporter
-                
-                print(f"[DEBUG Main] Query results count: {len(query_results) if query_results else 0}")
+                if not _HAS_EXCEL:
+                    raise ImportError("Excel export not available")
+
+                logger.debug("Query results count: %d", len(query_results) if query_results else 0)
+                successful_count = total_rows = 0
+                db_types = set()
                 if query_results:
-                    successful_count = sum(1 for r in query_results if r.success and r.data is not None and not r.data.empty)
-                    total_rows = sum(len(r.data) for r in query_results if r.success and r.data is not None and not r.data.empty)
-                    print(f"[DEBUG Main] Successful queries: {successful_count}, Total rows: {total_rows}")
-                    
-                    for i, result in enumerate(query_results):
-                        print(f"[DEBUG Main] Result {i}: Server={result.server_name}, Table={result.table_name}, Success={result.success}, Rows={len(result.data) if result.data is not None else 0}, Error={result.error}")
-                
-                if query_results and should_show_excel_export(query_results):
+                    # Single pass over the results instead of one comprehension
+                    # per aggregate
+                    for r in query_results:
+                        if r.success and r.data is not None and not r.data.empty:
+                            successful_count += 1
+                            total_rows += len(r.data)
+                            db_types.add(r.table_name.replace('_tb', '').upper())
+                    logger.debug("Successful queries: %d, Total rows: %d", successful_count, total_rows)
+
+                    if logger.isEnabledFor(logging.DEBUG):
+                        for i, result in enumerate(query_results):
+                            logger.debug("Result %d: Server=%s, Table=%s, Success=%s, Rows=%d, Error=%s",
+                                         i, result.server_name, result.table_name, result.success,
+                                         len(result.data) if result.data is not None else 0, result.error)
+
+                if query_results and total_rows:
                     # Store query results in session state for Excel export reference
                     st.session_state.last_query_results = query_results
-                    
-                    # Use session state to maintain exporter instance consistency
-                    if 'excel_exporter' not in st.session_state:
-                        st.session_state.excel_exporter = ExcelExporter()
-                    excel_component_id = st.session_state.excel_exporter.process_query_results_for_export(
-                        query_results, st.session_state.live_pending_question
+
+                    export_payload = _cached_excel_export(
+                        _hash_results(query_results),
+                        live["pending"],
+                        query_results
                     )
-                    if excel_component_id:
-                        # Get database types that were successfully queried
-                        db_types = [r.table_name.replace('_tb', '').upper() for r in query_results if r.success and r.data is not None and not r.data.empty]
-                        response += f"\n\n\n ****✅ Excel export generated with data from {', '.join(set(db_types))} databases ({total_rows} total records)****"
-                        print(f"[DEBUG Main] Excel export component created: {excel_component_id}")
+                    if export_payload:
+                        # A fresh id per session/rerun: the cached payload is
+                        # process-global but the store it renders from is not
+                        excel_component_id = get_excel_exporter().store_export_payload(export_payload)
+                        # db_types was already collected in the aggregation pass
+                        response += f"\n\n\n ****✅ Excel export generated with data from {', '.join(sorted(db_types))} databases ({total_rows} total records)****"
+                        logger.debug("Excel export component created: %s", excel_component_id)
                     else:
-                        print(f"[DEBUG Main] Excel export component creation failed")
+                        logger.debug("Excel export component creation failed")
                 else:
-                    print(f"[DEBUG Main] Excel export not triggered - insufficient data or criteria not met")
+                    logger.debug("Excel export not triggered - insufficient data or criteria not met")
             except ImportError:
                 pass  # Excel export not available
             except Exception as e:
-                print(f"[DEBUG Main] Excel export failed: {e}")
-                
+                logger.warning("Excel export failed: %s", e)
+
         except Exception as e:
-            print(f"[DEBUG] Processing failed: {e}")
+            logger.warning("Processing failed: %s", e)
         
         # Add assistant response
-        st.session_state.live_chat_history.append({
+        live["history"].append({
             'role': 'assistant',
             'content': response,
             'graph': graph_fig,
@@ -268,44 +365,91 @@ if st.session_state.live_processing_query and st.session_state.live_pending_ques
         })
     except Exception as e:
         # Add error response if query failed
-        st.session_state.live_chat_history.append({
+        live["history"].append({
             'role': 'assistant',
             'content': f"❌ Error processing your query: {str(e)}",
             'graph': None
         })
-    
+
     # Clear processing state
-    st.session_state.live_processing_query = False
-    st.session_state.live_pending_question = None
+    live["processing"] = False
+    live["pending"] = None
     st.rerun()
 
 def initialize_live_chatbot():
     """Initialize the live query chatbot"""
-    if "live_chatbot" not in st.session_state:
-        try:
-            st.session_state.live_chatbot = LiveQueryChatbot()
-            return True
-        except Exception as e:
-            st.error(f"❌ Could not initialize live query system: {str(e)}")
-            return False
-    return True
+    try:
+        get_live_chatbot()
+        return True
+    except Exception as e:
+        st.error(f"❌ Could not initialize live query system: {str(e)}")
+        return False
 
 def handle_live_chat_question(question):
     """Handle a question in the live chat interface with conversation history"""
+    live = st.session_state.live
+
     # Add user message to chat history
-    st.session_state.live_chat_history.append({
+    live["history"].append({
         'role': 'user',
         'content': question
     })
-    
-    # Set processing state and trigger rerun to show user message
-    st.session_state.live_processing_query = True
-    st.session_state.live_pending_question = question
-    st.rerun()
+
+    # Set processing state and trigger rerun to show user message - the
+    # pending-query handler lives at module scope, outside the chat fragment,
+    # so this must rerun the whole script
+    live["processing"] = True
+    live["pending"] = question
+    st.rerun(scope="app")
+
+@st.fragment
+def _chat_fragment():
+    """Chat history and input - rerun in isolation on user interaction"""
+    live = st.session_state.live
+
+    # Display chat conversation - only the most recent window renders inline;
+    # older messages sit behind a lazily-rendered expander so long sessions
+    # don't re-serialize the whole transcript every rerun
+    history = live["history"]
+    older = history[:-_HISTORY_WINDOW]
+    if older:
+        with st.expander(f"Show {len(older)} older messages"):
+            _render_messages(older)
+    _render_messages(history[-_HISTORY_WINDOW:])
+
+    # User input area - chat_input submits on Enter with no form machinery
+    user_question = st.chat_input(
+        "Type your question here (Press enter to ask)",
+        disabled=live["processing"]
+    )
+    if user_question and user_question.strip():
+        handle_live_chat_question(user_question.strip())
+
+def _render_messages(messages):
+    """Render a slice of chat history with native chat containers"""
+    for message in messages:
+        with st.chat_message(message['role']):
+            st.markdown(message['content'], unsafe_allow_html=True)
+
+            if message.get('graph') is not None:
+                # Display graph with fullscreen capability
+                st.plotly_chart(
+                    message['graph'],
+                    use_container_width=True,  # Allow fullscreen
+                    config=_PLOTLY_CONFIG
+                )
+
+            # Display Excel export component if available
+            if message.get('excel_component_id'):
+                try:
+                    get_excel_exporter().render_excel_export_ui(message['excel_component_id'])
+                except Exception as e:
+                    st.error(f"Excel export error: {e}")
+                    logger.exception("Excel export error")
 
 def render_live_query_interface():
     """Render the live query chatbot interface with conversation format"""
-    
+
     # Page header
     st.markdown("""
     <div class="main-header">
@@ -313,125 +457,13 @@ def render_live_query_interface():
         <p style="margin: 0.5rem 0 0 0; font-size: 1.2rem;">Ask questions about your database!</p>
     </div>
     """, unsafe_allow_html=True)
-    
+
     # Initialize chatbot if not already done
     initialize_live_chatbot()
-    
-    # Initialize chat history in session state
-    if "live_chat_history" not in st.session_state:
-        st.session_state.live_chat_history = [
-            {
-                'role': 'assistant',
-                'content': "Hi there, ask me anything!"
-            }
-        ]
-    
-    # Display chat conversation
-    for message in st.session_state.live_chat_history:
-        if message['role'] == 'user':
-            st.markdown(f"""
-            <div class="user-message">
-                <strong> You:</strong><br>
-                {message['content']}
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            # Check if message has graph to style appropriately
-            has_graph = message.get('graph') is not None
-            
-            if has_graph:
-                # Message with embedded graph
-                st.markdown(f"""
-                <div class="message-with-graph">
-                    <strong>DBA Chatbot:</strong><br>
-                    {message['content']}
-                    <div class="graph-container">
-                        <small>Interactive chart (click fullscreen icon for better view)</small>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Display graph with fullscreen capability
-                st.plotly_chart(
-                    message['graph'], 
-                    use_container_width=True,  # Allow fullscreen
-                    config={
-                        'displayModeBar': True,  # Show toolbar with fullscreen option
-                        'displaylogo': False,
-                        'modeBarButtonsToRemove': [
-                            'pan2d', 'lasso2d', 'select2d', 'autoScale2d'
-                        ]
-                    }
-                )
-                
-                # Display Excel export component if available
-                if message.get('excel_component_id'):
-                    try:
-                        from src.excel_exporter import ExcelExporter
-                        # Use session state to maintain exporter instance
-                        if 'excel_exporter' not in st.session_state:
-                            st.session_state.excel_exporter = ExcelExporter()
-                        st.session_state.excel_exporter.render_excel_export_ui(message['excel_component_id'])
-                    except Exception as e:
-                        st.error(f"Excel export error: {e}")
-                        import traceback
-                        print(f"[DEBUG] Excel export error traceback: {traceback.format_exc()}")
-                    
-            else:
-                # Regular message without graph
-                st.markdown(f"""
-                <div class="assistant-message">
-                    <strong>Smart DBA Bot:</strong><br>
-                    {message['content']}
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Display Excel export component if available
-                if message.get('excel_component_id'):
-                    try:
-                        from src.excel_exporter import ExcelExporter
-                        # Use session state to maintain exporter instance
-                        if 'excel_exporter' not in st.session_state:
-                            st.session_state.excel_exporter = ExcelExporter()
-                        st.session_state.excel_exporter.render_excel_export_ui(message['excel_component_id'])
-                    except Exception as e:
-                        st.error(f"Excel export error: {e}")
-                        import traceback
-                        print(f"[DEBUG] Excel export error traceback: {traceback.format_exc()}")
-    
-    # User input area
-    st.markdown("### Ask Your Question")
-    
-    # Use form to enable Enter key submission
-    with st.form(key="query_form", clear_on_submit=True):
-        user_question = st.text_input(
-            "Type your question here (Press enter to ask):",
-            placeholder="show me all server in dc4?",
-            #height=100,
-            disabled=st.session_state.live_processing_query
-        )
-        
-        # Query Live Database button 
-        col1, col2, col3 = st.columns([1, 2, 2])
-        
-        with col1:
-            button_disabled = st.session_state.live_processing_query
-            button_text = "***Ask***" if not button_disabled else "⏳ ***Processing...***"
-            
-            submitted = st.form_submit_button(
-                button_text, 
-                type="primary", 
-                disabled=button_disabled
-            )
-        
-        # Handle form submission
-        if submitted:
-            if user_question and user_question.strip():
-                handle_live_chat_question(user_question.strip())
-            else:
-                st.warning("⚠️ Please enter a question before submitting.")
-    
-    
+
+    # Chat history + input rerun as a fragment, skipping the rest of the page
+    _chat_fragment()
+
     # Help section
     st.markdown("---")
     with st.expander("💡 **Need Help? See Example Questions**", expanded=False):
@@ -445,6 +477,9 @@ def render_live_query_interface():
 
 def main():
     """Main application with simple authentication"""
+    # Inject app styling once per rerun from the cached blob
+    st.markdown(_inject_css(), unsafe_allow_html=True)
+
     # Initialize simple authentication
     auth = SimpleAuth()
     
@@ -459,55 +494,10 @@ def main():
             unsafe_allow_html=True
         )
         
-        # Custom CSS for purple logout button
-        st.markdown("""
-        <style>
-            /* Sidebar logout button styling */
-            .stButton[data-testid="baseButton-secondary"] > button {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-                color: white !important;
-                border: none !important;
-                border-radius: 8px !important;
-                padding: 8px 16px !important;
-                font-weight: 600 !important;
-                transition: all 0.3s ease !important;
-                width: 100% !important;
-                box-shadow: 0 2px 8px rgba(102, 126, 234, 0.3) !important;
-            }
-            
-            .stButton[data-testid="baseButton-secondary"] > button:hover {
-                transform: translateY(-1px) !important;
-                box-shadow: 0 4px 12px rgba(102, 126, 234, 0.5) !important;
-                background: linear-gradient(135deg, #5a6fd8 0%, #6a4c93 100%) !important;
-            }
-            
-            /* Alternative selector for sidebar buttons */
-            div[data-testid="stSidebar"] .stButton > button {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%) !important;
-                color: white !important;
-                border: none !important;
-                border-radius: 8px !important;
-                padding: 8px 16px !important;
-                font-weight: 600 !important;
-                transition: all 0.3s ease !important;
-                width: 100% !important;
-                box-shadow: 0 2px 8px rgba(102, 126, 234, 0.3) !important;
-            }
-            
-            div[data-testid="stSidebar"] .stButton > button:hover {
-                transform: translateY(-1px) !important;
-                box-shadow: 0 4px 12px rgba(102, 126, 234, 0.5) !important;
-                background: linear-gradient(135deg, #5a6fd8 0%, #6a4c93 100%) !important;
-            }
-        </style>
-        """, unsafe_allow_html=True)
-        
         if st.sidebar.button("Logout", key="logout_btn"):
             auth.logout()
         render_live_query_interface()
 
-# Main execution
-if __name__ == "__main__":
-    main()
-else:
-    main()
+# Main execution - Streamlit executes this module directly, so a single
+# unconditional call covers both entry paths
+main()
@@ -0,0 +1,330 @@
+# debug_connection.py - Database connection diagnostics page
+"""
+Connection Debugger for Smart DBA Bot
+=====================================
+
+Standalone Streamlit page that walks through the connectivity stack for the
+primary datacenter host (DC4): environment variables, DNS, TCP, SSL, the
+psycopg2 connection strategies, and a small test query.
+
+Usage: streamlit run debug_connection.py
+"""
+
+import atexit
+import random
+import select
+import socket
+import ssl
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from types import MappingProxyType
+
+import streamlit as st
+import psycopg2
+from psycopg2 import pool
+from psycopg2.extras import NamedTupleCursor
+
+from src.env_helper import load_database_config
+
+st.set_page_config(
+    page_title="Connection Debugger",
+    page_icon="🔧",
+    layout="wide"
+)
+
+st.title("🔧 Database Connection Debugger")
+st.markdown("Step-by-step connectivity checks for the primary datacenter host.")
+
+# Load configuration from secrets / .env
+config = load_database_config()
+host1 = config.get('HEALTH_CHECK_HOST_1')
+port = config.get('HEALTH_CHECK_PORT')
+db = config.get('HEALTH_CHECK_DB')
+user = config.get('HEALTH_CHECK_USER')
+password = config.get('HEALTH_CHECK_PASSWORD')
+
+# ── 1. Environment Variables Check ────────────────────────────────────────────
+st.header("1. Environment Variables Check")
+
+# One table is a single websocket frame and DOM mount, versus ten separate
+# st.success/st.error elements
+_SECRET_KEYS = frozenset({'GITHUB_TOKEN', 'HEALTH_CHECK_PASSWORD'})
+
+env_rows = []
+for key in ('GITHUB_TOKEN', 'OPENAI_MODEL', 'HEALTH_CHECK_HOST_1',
+            'HEALTH_CHECK_HOST_2', 'HEALTH_CHECK_HOST_3', 'HEALTH_CHECK_HOST_4',
+            'HEALTH_CHECK_DB', 'HEALTH_CHECK_USER', 'HEALTH_CHECK_PASSWORD',
+            'HEALTH_CHECK_PORT'):
+    value = config.get(key)
+    if not value:
+        status = '❌ missing'
+    elif key in _SECRET_KEYS:
+        status = '✅ set'
+    else:
+        status = f'✅ {value}'
+    env_rows.append({'Variable': key, 'Status': status})
+
+st.table(env_rows)
+
+# ── 2-4. Network Probes (DNS / TCP / SSL) ─────────────────────────────────────
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _resolve_host(hostname):
+    """Resolve a hostname once per hour instead of on every rerun."""
+    return socket.gethostbyname(hostname)
+
+
+def _dns_check(host):
+    """Resolve *host*; returns (ok, message)."""
+    try:
+        return True, f"✅ DNS resolution: {host} → {_resolve_host(host)}"
+    except socket.gaierror as e:
+        return False, f"❌ DNS resolution failed for {host}: {e}"
+
+
+def _tcp_ssl_check(host, port):
+    """Dial once, then SSL-wrap the same socket.
+
+    TCP and SSL stay in one task so the handshake is paid once; returns
+    ((tcp_ok, tcp_msg), (ssl_ok, ssl_msg)).
+    """
+    try:
+        sock = socket.create_connection((host, int(port)), timeout=15)
+    except OSError as e:
+        return ((False, f"❌ TCP connection to {host}:{port} failed: {e}"),
+                (False, "⚠️ Skipping SSL check - TCP connection failed"))
+
+    tcp_result = (True, f"✅ TCP connection to {host}:{port} succeeded")
+    try:
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        with context.wrap_socket(sock, server_hostname=host,
+                                 do_handshake_on_connect=True) as ssock:
+            return tcp_result, (True, f"✅ SSL handshake succeeded ({ssock.version()})")
+    except (OSError, ssl.SSLError) as e:
+        sock.close()
+        return tcp_result, (False, f"❌ SSL handshake failed: {e}")
+
+
+def _render_probe(ok, message):
+    if ok:
+        st.success(message)
+    elif message.startswith("⚠️"):
+        st.warning(message)
+    else:
+        st.error(message)
+
+
+# The probes are independent network round-trips; overlapping them cuts the
+# debug section's wall time to roughly the slowest probe
+if host1 and port:
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        dns_future = executor.submit(_dns_check, host1)
+        conn_future = executor.submit(_tcp_ssl_check, host1, port)
+        dns_result = dns_future.result()
+        tcp_result, ssl_result = conn_future.result()
+
+    st.header("2. DNS Resolution")
+    _render_probe(*dns_result)
+    st.header("3. TCP Connectivity")
+    _render_probe(*tcp_result)
+    st.header("4. SSL Handshake")
+    _render_probe(*ssl_result)
+else:
+    st.header("2. DNS Resolution")
+    st.warning("⚠️ Skipping DNS check - no host configured")
+    st.header("3. TCP Connectivity")
+    st.warning("⚠️ Skipping TCP check - host/port not configured")
+    st.header("4. SSL Handshake")
+    st.warning("⚠️ Skipping SSL check - host/port not configured")
+
+
+# ── Connection pooling ────────────────────────────────────────────────────────
+@st.cache_resource
+def get_connection_pool(conn_params_items):
+    """Return a shared ThreadedConnectionPool for the given connection params.
+
+    Cached per parameter tuple, so repeated button clicks reuse the already
+    authenticated backend sessions instead of paying the TCP+TLS+auth
+    handshake again. Closed at process exit.
+    """
+    conn_pool = pool.ThreadedConnectionPool(
+        minconn=1,
+        maxconn=5,
+        **dict(conn_params_items)
+    )
+    atexit.register(conn_pool.closeall)
+    return conn_pool
+
+
+@st.cache_resource
+def _base_conn_params():
+    """Base psycopg2 parameters shared by the connection and query tests.
+
+    Built once per process; the read-only proxy keeps call sites from
+    mutating the cached dict - they spread it into their own copy and set
+    sslmode there.
+    """
+    return MappingProxyType({
+        'host': config['HEALTH_CHECK_HOST_1'],
+        'port': int(config['HEALTH_CHECK_PORT']),
+        'dbname': config['HEALTH_CHECK_DB'],
+        'user': config['HEALTH_CHECK_USER'],
+        'password': config['HEALTH_CHECK_PASSWORD'],
+        'connect_timeout': 30,
+        # TCP keepalives: Streamlit Cloud NAT silently reaps idle
+        # connections, which otherwise surfaces as "SSL SYSCALL
+        # error: EOF detected" on the next click
+        'keepalives': 1,
+        'keepalives_idle': 120,
+        'keepalives_interval': 10,
+        'keepalives_count': 3,
+    })
+
+
+def _probe_sslmodes(conn_params, sslmodes, timeout=10.0):
+    """Race async connection attempts for every sslmode at once.
+
+    Opens one non-blocking connection per sslmode and drives them all in a
+    single select loop, so total wall time is bounded by the fastest
+    successful handshake rather than the sum of sequential attempts.
+    Returns the winning sslmode, or None if none completed in time.
+    """
+    probes = {}
+    for sslmode in sslmodes:
+        try:
+            probes[sslmode] = psycopg2.connect(
+                async_=True, **{**conn_params, 'sslmode': sslmode}
+            )
+        except Exception:
+            pass
+
+    winner = None
+    deadline = time.monotonic() + timeout
+    while probes and winner is None and time.monotonic() < deadline:
+        rlist, wlist = [], []
+        for sslmode, conn in list(probes.items()):
+            try:
+                state = conn.poll()
+            except Exception:
+                conn.close()
+                del probes[sslmode]
+                continue
+            if state == psycopg2.extensions.POLL_OK:
+                winner = sslmode
+                break
+            elif state == psycopg2.extensions.POLL_READ:
+                rlist.append(conn.fileno())
+            elif state == psycopg2.extensions.POLL_WRITE:
+                wlist.append(conn.fileno())
+        if winner is None and (rlist or wlist):
+            select.select(rlist, wlist, [], 0.1)
+
+    for conn in probes.values():
+        conn.close()
+    return winner
+
+
+def _try_connect(conn_params, sslmode, attempts=3, budget=30.0):
+    """Try one sslmode strategy with exponential backoff and jitter.
+
+    Transient failures (DB restarting, NAT hiccup) are retried with a
+    randomized, exponentially growing delay so a recovering server is not
+    hammered. Returns (version, None) on success or (None, last_error)
+    once the attempts or the wallclock budget are exhausted.
+    """
+    conn_params['sslmode'] = sslmode
+    deadline = time.monotonic() + budget
+    last_error = None
+
+    for attempt in range(attempts):
+        try:
+            conn_pool = get_connection_pool(tuple(sorted(conn_params.items())))
+            conn = conn_pool.getconn()
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT version()")
+                    return cursor.fetchone()[0], None
+            finally:
+                conn_pool.putconn(conn)
+        except Exception as e:
+            last_error = e
+            delay = random.uniform(0.5, 1.5) * 2 ** attempt
+            if attempt + 1 == attempts or time.monotonic() + delay >= deadline:
+                break
+            time.sleep(delay)
+
+    return None, last_error
+
+
+# ── 5. Database Connection Test ───────────────────────────────────────────────
+st.header("5. Database Connection Test")
+
+if st.button("Test Database Connection"):
+    if host1 and port and db and user and password:
+        conn_params = dict(_base_conn_params())
+        connected = False
+
+        # Race all three sslmodes at once; wall time is the fastest
+        # handshake, not the sum of sequential attempts
+        winner = _probe_sslmodes(conn_params, ('prefer', 'disable', 'require'))
+        if winner is not None:
+            version, error = _try_connect(conn_params, winner)
+            if error is None:
+                st.success(f"✅ Connected with sslmode={winner}: {version}")
+                connected = True
+            else:
+                st.warning(f"⚠️ sslmode={winner} won the probe but failed: {error}")
+
+        # Probe found nothing (or the winner regressed): fall back to the
+        # sequential strategies with backoff
+        if not connected:
+            for strategy, sslmode in enumerate(('prefer', 'disable', 'require'), start=1):
+                version, error = _try_connect(conn_params, sslmode)
+                if error is None:
+                    st.success(f"✅ Strategy {strategy} (sslmode={sslmode}) connected: {version}")
+                    connected = True
+                    break
+                elif sslmode == 'require':
+                    st.error(f"❌ Strategy {strategy} (sslmode={sslmode}) failed: {error}")
+                else:
+                    st.warning(f"⚠️ Strategy {strategy} (sslmode={sslmode}) failed: {error}")
+
+        if not connected:
+            st.error("❌ All connection strategies failed - check credentials and network access")
+    else:
+        st.error("❌ Missing connection settings - fix the environment variables above first")
+
+# ── 6. Database Query Test ────────────────────────────────────────────────────
+st.header("6. Database Query Test")
+
+if st.button("Test Database Query"):
+    if host1 and port and db and user and password:
+        try:
+            conn_params = {**_base_conn_params(), 'sslmode': 'prefer'}
+            conn_pool = get_connection_pool(tuple(sorted(conn_params.items())))
+            conn = conn_pool.getconn()
+            try:
+                # Named (server-side) cursor: the client only ever buffers
+                # itersize rows instead of materializing the full result
+                with conn.cursor(name='dbg_cur',
+                                 cursor_factory=NamedTupleCursor) as cursor:
+                    cursor.itersize = 3
+                    cursor.execute(
+                        "SELECT hostname, database_name, database_status "
+                        "FROM oracle_tb ORDER BY data_extracted_on DESC LIMIT 3"
+                    )
+                    rows = list(islice(cursor, 3))
+
+                st.success(f"✅ Query succeeded - {len(rows)} rows returned")
+                for row in rows:
+                    st.write(f"- {row.hostname} | {row.database_name} | {row.database_status}")
+            finally:
+                conn_pool.putconn(conn)
+        except Exception as e:
+            st.error(f"❌ Query test failed: {e}")
+    else:
+        st.error("❌ Missing connection settings - fix the environment variables above first")
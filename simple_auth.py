@@ -1,9 +1,123 @@
 import streamlit as st
 import yaml
+try:
+    # libyaml C bindings - much faster than the pure-Python scanner
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+import functools
 import hashlib
-import datetime
 import jwt
 import hmac
+import logging
+import os
+import time
+
+log = logging.getLogger(__name__)
+
+
+# Login-page chrome, built once at import instead of per rerun
+_LOGIN_CSS = """
+<style>
+    /* Login page specific styling */
+    .login-header {
+        text-align: center;
+        padding: 3rem 0 2rem 0;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        border-radius: 15px;
+        margin-bottom: 3rem;
+        color: white;
+        box-shadow: 0 8px 32px rgba(102, 126, 234, 0.3);
+    }
+
+
+    .login-title {
+        text-align: center;
+        color: #333;
+        margin-bottom: 2rem;
+        font-weight: 600;
+    }
+
+    /* Custom input styling */
+    .stTextInput > div > div > input {
+        border-radius: 8px;
+        border: 2px solid #e0e0e0;
+        padding: 12px 16px;
+        font-size: 16px;
+        transition: all 0.3s ease;
+    }
+
+    .stTextInput > div > div > input:focus {
+        border-color: #667eea;
+        box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
+    }
+
+    /* Custom button styling */
+    .stButton > button {
+        width: 100%;
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        border: none;
+        border-radius: 8px;
+        padding: 12px;
+        font-size: 16px;
+        font-weight: 600;
+        color: white;
+        transition: all 0.3s ease;
+        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
+    }
+
+    .stButton > button:hover {
+        transform: translateY(-2px);
+        box-shadow: 0 6px 20px rgba(102, 126, 234, 0.4);
+        background: linear-gradient(135deg, #5a6fd8 0%, #6a4c93 100%);
+    }
+
+    /* Hide main menu and footer for login */
+    #MainMenu {visibility: hidden;}
+    footer {visibility: hidden;}
+    header {visibility: hidden;}
+</style>
+"""
+
+_LOGIN_HEADER = """
+<div class="login-header">
+    <h1 style="margin: 0; font-size: 3rem; font-weight: 700;">Smart DBA Bot</h1>
+    <p style="margin: 1rem 0 0 0; font-size: 1.3rem; opacity: 0.9;">Ask questions about your database!</p>
+</div>
+"""
+
+
+@functools.lru_cache(maxsize=1)
+def _load_yaml_cached(path, mtime):
+    """Parse the YAML config, memoized on (path, mtime).
+
+    Streamlit reruns the script on every widget interaction and each rerun
+    builds a fresh SimpleAuth, so without memoization the config is
+    re-tokenized constantly. The mtime key means edits to the file still
+    take effect on the next rerun.
+    """
+    with open(path, 'r') as file:
+        config = yaml.load(file, Loader=_YamlLoader)
+
+    # Normalize every stored password to a raw 32-byte SHA256 digest at
+    # load time: hex digests are decoded, plain-text entries are hashed
+    # in memory. Verification is then one constant-time compare with no
+    # per-call type sniffing, and no plaintext stays resident.
+    if config:
+        users = config.get('credentials', {}).get('usernames', {})
+        for user_info in users.values():
+            stored = user_info.get('password')
+            if isinstance(stored, bytes):
+                continue
+            if isinstance(stored, str) and len(stored) == 64:
+                try:
+                    user_info['password'] = bytes.fromhex(stored)
+                    continue
+                except ValueError:
+                    pass  # not a hex digest - hash it below
+            user_info['password'] = hashlib.sha256(str(stored).encode('utf-8')).digest()
+
+    return config
 
 
 class SimpleAuth:
@@ -11,12 +125,17 @@ class SimpleAuth:
         """Initialize the authentication system with config file."""
         self.config_file = config_file
         self.config = self._load_config()
+        # Resolve the JWT settings once; encode/decode run on every rerun
+        # and should not re-walk the config dict or re-encode the key
+        cookie_config = (self.config or {}).get('cookie', {})
+        self._jwt_secret = cookie_config.get('key', 'default_secret_key').encode()
+        self._jwt_exp_days = cookie_config.get('expiry_days', 30)
         
     def _load_config(self):
         """Load configuration from YAML file."""
         try:
-            with open(self.config_file, 'r') as file:
-                return yaml.safe_load(file)
+            mtime = os.path.getmtime(self.config_file)
+            return _load_yaml_cached(self.config_file, mtime)
         except FileNotFoundError:
             st.error(f"Configuration file {self.config_file} not found!")
             return None
@@ -25,17 +144,23 @@ class SimpleAuth:
             return None
     
     def _hash_password(self, password):
-        """Hash password using SHA256."""
-        return hashlib.sha256(str.encode(password)).hexdigest()
+        """Hash password using SHA256, returning the raw 32-byte digest.
+
+        Accepts str or bytes so callers that already hold encoded bytes
+        don't pay a second encode per attempt.
+        """
+        if not isinstance(password, (bytes, bytearray)):
+            password = password.encode('utf-8')
+        return hashlib.sha256(password).digest()
     
     def _verify_password(self, stored_password, provided_password):
-        """Verify if provided password matches stored password."""
-        # If stored password is already hashed, compare with hashed provided password
-        if len(stored_password) == 64:  # SHA256 hash length
-            return stored_password == self._hash_password(provided_password)
-        else:
-            # If stored password is plain text, compare directly
-            return stored_password == provided_password
+        """Verify if provided password matches stored password.
+
+        Stored passwords are all normalized to 32-byte digests at config
+        load, so this is a single constant-time compare with no branching
+        on the storage format.
+        """
+        return hmac.compare_digest(stored_password, self._hash_password(provided_password))
     
     def authenticate_user(self, username, password):
         """Authenticate user with username and password."""
@@ -43,19 +168,18 @@ class SimpleAuth:
             return False
             
         users = self.config.get('credentials', {}).get('usernames', {})
-        
-        # Debug prints
-        print(f"Debug - Username: {repr(username)}")
-        print(f"Debug - Password: {repr(password)}")
-        print(f"Debug - Available users: {list(users.keys())}")
-        
+
+        # %-style args are only formatted when DEBUG is enabled, so the
+        # hot auth path does no stdout I/O (and leaks no credentials)
+        log.debug("Debug - Username: %r", username)
+        log.debug("Debug - Available users: %s", list(users.keys()))
+
         if username in users:
             stored_password = users[username]['password']
-            print(f"Debug - Stored password: {repr(stored_password)}")
-            
+
             is_match = self._verify_password(stored_password, password)
-            print(f"Debug - Password match: {is_match}")
-            
+            log.debug("Debug - Password match: %s", is_match)
+
             if is_match:
                 return True
         
@@ -73,17 +197,15 @@ class SimpleAuth:
         """Create JWT token for authenticated user."""
         if not self.config:
             return None
-            
-        cookie_config = self.config.get('cookie', {})
-        secret_key = cookie_config.get('key', 'default_secret_key')
-        expiry_days = cookie_config.get('expiry_days', 30)
-        
+
+        # Numeric exp claim: one integer add instead of datetime arithmetic,
+        # and avoids the deprecated utcnow()
         payload = {
             'username': username,
-            'exp': datetime.datetime.utcnow() + datetime.timedelta(days=expiry_days)
+            'exp': int(time.time()) + self._jwt_exp_days * 86400
         }
-        
-        return jwt.encode(payload, secret_key, algorithm='HS256')
+
+        return jwt.encode(payload, self._jwt_secret, algorithm='HS256')
     
     def verify_jwt_token(self, token):
         """Verify JWT token and return username if valid."""
@@ -91,11 +213,11 @@ class SimpleAuth:
             return None
             
         try:
-            cookie_config = self.config.get('cookie', {})
-            secret_key = cookie_config.get('key', 'default_secret_key')
-            
-            payload = jwt.decode(token, secret_key, algorithms=['HS256'])
-            return payload.get('username')
+            payload = jwt.decode(token, self._jwt_secret, algorithms=['HS256'])
+            username = payload.get('username')
+            # Remember the verdict so reruns don't redo the HMAC + JSON work
+            st.session_state['_jwt_verified'] = (token, username, payload.get('exp', 0))
+            return username
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
@@ -103,77 +225,15 @@ class SimpleAuth:
     
     def login_form(self):
         """Display enhanced login form with branding and better UI."""
-        # Custom CSS for login page
-        st.markdown("""
-        <style>
-            /* Login page specific styling */
-            .login-header {
-                text-align: center;
-                padding: 3rem 0 2rem 0;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                border-radius: 15px;
-                margin-bottom: 3rem;
-                color: white;
-                box-shadow: 0 8px 32px rgba(102, 126, 234, 0.3);
-            }
-            
-            
-            .login-title {
-                text-align: center;
-                color: #333;
-                margin-bottom: 2rem;
-                font-weight: 600;
-            }
-            
-            /* Custom input styling */
-            .stTextInput > div > div > input {
-                border-radius: 8px;
-                border: 2px solid #e0e0e0;
-                padding: 12px 16px;
-                font-size: 16px;
-                transition: all 0.3s ease;
-            }
-            
-            .stTextInput > div > div > input:focus {
-                border-color: #667eea;
-                box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.1);
-            }
-            
-            /* Custom button styling */
-            .stButton > button {
-                width: 100%;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                border: none;
-                border-radius: 8px;
-                padding: 12px;
-                font-size: 16px;
-                font-weight: 600;
-                color: white;
-                transition: all 0.3s ease;
-                box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-            }
-            
-            .stButton > button:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 6px 20px rgba(102, 126, 234, 0.4);
-                background: linear-gradient(135deg, #5a6fd8 0%, #6a4c93 100%);
-            }
-            
-            /* Hide main menu and footer for login */
-            #MainMenu {visibility: hidden;}
-            footer {visibility: hidden;}
-            header {visibility: hidden;}
-        </style>
-        """, unsafe_allow_html=True)
-        
+        # Chrome is built once at import (the win is hoisting the string
+        # build); it must still be emitted on every run - Streamlit removes
+        # elements that a rerun doesn't re-emit, so a once-per-session guard
+        # would drop the styling after the first widget interaction
+        st.markdown(_LOGIN_CSS, unsafe_allow_html=True)
+
         # Main header with branding
-        st.markdown("""
-        <div class="login-header">
-            <h1 style="margin: 0; font-size: 3rem; font-weight: 700;">Smart DBA Bot</h1>
-            <p style="margin: 1rem 0 0 0; font-size: 1.3rem; opacity: 0.9;">Ask questions about your database!</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
+        st.markdown(_LOGIN_HEADER, unsafe_allow_html=True)
+
         # Center the login form
         col1, col2, col3 = st.columns([1, 2, 1])
         
@@ -227,6 +287,14 @@ class SimpleAuth:
         # Check JWT token if available
         token = st.session_state.get('token')
         if token:
+            # Fast path: the same token was verified on a previous rerun and
+            # has not expired yet - skip the full decode
+            cached = st.session_state.get('_jwt_verified')
+            if cached and cached[0] == token and time.time() < cached[2]:
+                st.session_state['authenticated'] = True
+                st.session_state['username'] = cached[1]
+                return True
+
             username = self.verify_jwt_token(token)
             if username:
                 st.session_state['authenticated'] = True
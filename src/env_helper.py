@@ -7,19 +7,28 @@ This module handles environment variables for both local development (.env file)
 and Streamlit Cloud deployment (secrets.toml).
 """
 
+import functools
 import os
 import streamlit as st
 from dotenv import load_dotenv
 
+# Parse the local .env file once at import time - previously every
+# get_env_var call re-read and re-parsed it
+load_dotenv()
 
+
+@functools.lru_cache(maxsize=256)
 def get_env_var(key: str, default: str = None) -> str:
     """
     Get environment variable from either Streamlit secrets or .env file.
-    
+
+    Lookups are memoized, so repeated calls during Streamlit reruns are
+    plain cache hits.
+
     Args:
         key: Environment variable key
         default: Default value if key not found
-        
+
     Returns:
         Environment variable value
     """
@@ -29,12 +38,12 @@ def get_env_var(key: str, default: str = None) -> str:
             return st.secrets[key]
     except Exception:
         pass
-    
+
     # Fallback to standard environment variables (.env file for local)
-    load_dotenv()  # Load .env file if it exists
     return os.getenv(key, default)
 
 
+@st.cache_data
 def load_database_config():
     """
     Load database configuration for both local and cloud environments.
@@ -10,13 +10,70 @@ Provides Excel export functionality for query results:
 - Integration with Smart DBA Bot chat system
 """
 
+import logging
+import numpy as np
 import pandas as pd
 import io
 import base64
+import threading
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
 import streamlit as st
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+
+try:
+    # Optional fast path: Arrow-columnar xlsx serialization
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+try:
+    # Optional: Parquet companion download for exports past the Excel
+    # preview cap; without pyarrow the preview workbook still ships
+    import pyarrow  # noqa: F401
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+
+log = logging.getLogger(__name__)
+
+# Most recent exports kept per session; older excel_bytes are evicted so a
+# long chat session doesn't accumulate every workbook ever generated
+_MAX_STORED_EXPORTS = 3
+
+# Beyond this the workbook only carries a head/tail preview and the full
+# data ships as a Parquet download - huge xlsx files are slow to write,
+# download and open, and Excel itself tops out near 1M rows per sheet
+MAX_EXCEL_ROWS = 100_000
+
+
+class _FastZipFile(zipfile.ZipFile):
+    """ZipFile pinned to DEFLATE level 1.
+
+    These workbooks are transient chat downloads, so trading ~15% larger
+    files for a severalfold cheaper compression pass is the right side of
+    the CPU/size curve. xlsxwriter exposes no compression knob, hence the
+    module-attribute override below.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('compresslevel', 1)
+        super().__init__(*args, **kwargs)
+
+
+try:
+    import xlsxwriter.workbook as _xlsx_workbook
+    _xlsx_workbook.ZipFile = _FastZipFile
+except ImportError:
+    pass
 
 @dataclass
 class ExcelExportData:
@@ -33,7 +90,11 @@ class ExcelExporter:
     """
     
     def __init__(self):
-        self.temp_files = {}  # Store temporary Excel files
+        # Reusable scratch buffer for serialization, one per thread: the
+        # exporter is a process-wide singleton and Streamlit runs each
+        # session's script in its own thread, so a shared BytesIO would
+        # interleave concurrent exports into a corrupt workbook
+        self._scratch = threading.local()
     
     def should_export_to_excel(self, query_results: List, min_rows: int = 15) -> bool:
         """
@@ -41,50 +102,66 @@ class ExcelExporter:
         
         """
         total_rows = 0
-        successful_results = 0
-        
         for result in query_results:
             if result.success and result.data is not None and not result.data.empty:
                 total_rows += len(result.data)
-                successful_results += 1
-        
-        print(f"[DEBUG Excel] Total rows: {total_rows}, Successful results: {successful_results}, Min rows: {min_rows}")
-        print(f"[DEBUG Excel] Should export: {total_rows > min_rows}")
-        
-        return total_rows > min_rows
+                if total_rows > min_rows:
+                    # Only the boolean matters - stop scanning as soon as
+                    # the threshold is crossed
+                    log.debug("Export threshold %d crossed", min_rows)
+                    return True
+
+        log.debug("Total rows: %d, min rows: %d, should export: False",
+                  total_rows, min_rows)
+        return False
     
     def prepare_excel_data(self, query_results: List, query_text: str = "") -> Optional[ExcelExportData]:
         """
         Prepare data for Excel export from query results
+
+        The source result frames are never copied or mutated: they feed a
+        single pd.concat(copy=False) and the metadata columns are attached
+        only to the combined output.
         """
         if not self.should_export_to_excel(query_results):
             return None
         
         # Combine all successful results
-        all_data = []
-        datacenter_info = []
-        
+        frames = []
+        meta = []  # (datacenter, db_type, exec_time, row_count) per frame
+
         for result in query_results:
             if result.success and result.data is not None and not result.data.empty:
-                df = result.data.copy()
-                # Add source information
-                df['Source_Datacenter'] = result.server_name
-                df['Database_Type'] = result.table_name.replace('_tb', '').upper()
-                df['Query_Execution_Time'] = f"{result.execution_time:.2f}s"
-                
-                all_data.append(df)
-                datacenter_info.append({
-                    'Datacenter': result.server_name,
-                    'Database_Type': result.table_name.replace('_tb', '').upper(),
-                    'Record_Count': len(df),
-                    'Execution_Time': f"{result.execution_time:.2f}s"
-                })
-        
-        if not all_data:
+                frames.append(result.data)
+                meta.append((
+                    result.server_name,
+                    result.table_name.replace('_tb', '').upper(),
+                    f"{result.execution_time:.2f}s",
+                    len(result.data)
+                ))
+
+        if not frames:
             return None
-        
-        # Combine all data
-        combined_df = pd.concat(all_data, ignore_index=True, sort=False)
+
+        # One concat owns the output buffers; the source frames are neither
+        # copied nor mutated
+        combined_df = pd.concat(frames, ignore_index=True, sort=False, copy=False)
+
+        # Arrow-backed dtypes keep string columns in contiguous buffers
+        # instead of a Python object per cell; skipped when pyarrow is not
+        # installed
+        try:
+            combined_df = combined_df.convert_dtypes(dtype_backend='pyarrow')
+        except ImportError:
+            pass
+
+        # Attach metadata as categoricals built with np.repeat: one
+        # dictionary entry per distinct value instead of a Python string
+        # object per row
+        counts = [m[3] for m in meta]
+        combined_df['Source_Datacenter'] = pd.Categorical(np.repeat([m[0] for m in meta], counts))
+        combined_df['Database_Type'] = pd.Categorical(np.repeat([m[1] for m in meta], counts))
+        combined_df['Query_Execution_Time'] = pd.Categorical(np.repeat([m[2] for m in meta], counts))
         
         # Create filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -103,105 +180,276 @@ class ExcelExporter:
             total_rows=len(combined_df)
         )
     
+    @staticmethod
+    def _datacenter_count(df: pd.DataFrame) -> int:
+        """Distinct datacenter count without re-scanning the column.
+
+        Source_Datacenter is built as a Categorical whose categories are
+        exactly the observed values, so the count is just the dictionary
+        size; falls back to nunique for plain dtypes.
+        """
+        dc_col = df['Source_Datacenter']
+        if isinstance(dc_col.dtype, pd.CategoricalDtype):
+            return len(dc_col.cat.categories)
+        return dc_col.nunique()
+
+    @staticmethod
+    def _build_summary(df: pd.DataFrame) -> pd.DataFrame:
+        """Build the per-(datacenter, db_type) summary with one groupby pass."""
+        # One hash-group pass instead of a boolean-mask scan per
+        # (datacenter, db_type) pair; observed=True skips empty
+        # category combinations
+        if 'hostname' in df.columns:
+            unique_servers = ('hostname', 'nunique')
+        else:
+            unique_servers = ('Source_Datacenter', lambda _: 'N/A')
+        return (
+            df.groupby(['Source_Datacenter', 'Database_Type'],
+                       observed=True, sort=False)
+            .agg(Record_Count=('Source_Datacenter', 'size'),
+                 Unique_Servers=unique_servers)
+            .reset_index()
+            .rename(columns={'Source_Datacenter': 'Datacenter'})
+        )
+
     def create_excel_file(self, export_data: ExcelExportData) -> bytes:
         """
         Create formatted Excel file from export data
-        
+
+        Prefers polars.write_excel (Arrow-columnar, C-level cell writing)
+        when polars is installed, falling back to pandas + xlsxwriter in
+        constant_memory mode: each row is flushed to the buffer as it is
+        written, so no in-memory cell tree is retained, and string-to-
+        formula/URL auto-parsing is disabled.
+
+        Frames beyond MAX_EXCEL_ROWS are written as a head/tail preview;
+        the caller pairs that with a Parquet download of the full data.
         """
-        buffer = io.BytesIO()
-        
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            # Write main data
-            export_data.data.to_excel(
-                writer, 
-                sheet_name=export_data.sheet_name,
-                index=False,
-                startrow=2  # Leave space for title
+        df = export_data.data
+        if len(df) > MAX_EXCEL_ROWS:
+            half = MAX_EXCEL_ROWS // 2
+            df = pd.concat([df.head(half), df.tail(half)], copy=False)
+            export_data = replace(
+                export_data,
+                data=df,
+                title=(export_data.title
+                       + f" | PREVIEW: first/last {half} rows - download Parquet for full data"),
             )
-            
-            # Get the worksheet to add formatting
-            worksheet = writer.sheets[export_data.sheet_name]
-            
-            # Add title
-            worksheet['A1'] = export_data.title
-            worksheet['A1'].font = worksheet['A1'].font.copy(bold=True, size=14)
-            
-            # Auto-adjust column widths
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                
-                # Set column width (max 50 characters)
-                adjusted_width = min(max_length + 2, 50)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
-            
+
+        # Reuse this thread's scratch buffer, pre-grown to a rough
+        # compressed-size estimate so it doesn't double-and-copy while the
+        # zip stream lands
+        buffer = getattr(self._scratch, 'buf', None)
+        if buffer is None:
+            buffer = self._scratch.buf = io.BytesIO()
+        buffer.seek(0)
+        buffer.truncate(0)
+        estimated = max(64 * 1024, export_data.total_rows * len(df.columns) * 6)
+        buffer.write(b'\0' * estimated)
+        buffer.seek(0)
+
+        if pl is not None and xlsxwriter is not None:
+            try:
+                return self._create_excel_with_polars(export_data, buffer)
+            except Exception:
+                log.exception("polars fast path failed, falling back to pandas writer")
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        return self._create_excel_with_pandas(export_data, buffer)
+
+    def _create_excel_with_polars(self, export_data: ExcelExportData,
+                                  buffer: io.BytesIO) -> bytes:
+        """Serialize via polars' xlsxwriter-backed columnar writer."""
+        df = export_data.data
+
+        workbook = xlsxwriter.Workbook(buffer, {
+            'in_memory': True,
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+        })
+        title_format = workbook.add_format({'bold': True, 'font_size': 14})
+
+        worksheet = workbook.add_worksheet(export_data.sheet_name)
+        worksheet.write(0, 0, export_data.title, title_format)
+        pl.from_pandas(df).write_excel(
+            workbook=workbook,
+            worksheet=export_data.sheet_name,
+            position="A3",
+            autofit=True,
+        )
+
+        if self._datacenter_count(df) > 1:
+            summary_ws = workbook.add_worksheet('Summary')
+            summary_ws.write(0, 0, 'Query Results Summary', title_format)
+            pl.from_pandas(self._build_summary(df)).write_excel(
+                workbook=workbook,
+                worksheet='Summary',
+                position="A2",
+            )
+
+        workbook.close()
+        buffer.truncate(buffer.tell())
+        return bytes(buffer.getbuffer())
+
+    def _create_excel_with_pandas(self, export_data: ExcelExportData,
+                                  buffer: io.BytesIO) -> bytes:
+        """Fallback writer: pandas to_excel on constant_memory xlsxwriter."""
+        df = export_data.data
+
+        with pd.ExcelWriter(
+            buffer,
+            engine='xlsxwriter',
+            engine_kwargs={'options': {
+                'constant_memory': True,
+                'strings_to_formulas': False,
+                'strings_to_urls': False,
+            }},
+        ) as writer:
+            workbook = writer.book
+            title_format = workbook.add_format({'bold': True, 'font_size': 14})
+
+            # Create the sheet ourselves so the title lands on row 0 before
+            # to_excel streams rows - constant_memory writes are in order
+            worksheet = workbook.add_worksheet(export_data.sheet_name)
+            writer.sheets[export_data.sheet_name] = worksheet
+            worksheet.write(0, 0, export_data.title, title_format)
+
+            # One vectorized pass over a bounded sample replaces per-cell
+            # Python length checks; set_column is column metadata, safe in
+            # constant_memory mode
+            header_lengths = [len(str(c)) for c in df.columns]
+            sample = df.head(500)
+            if sample.empty:
+                widths = np.array(header_lengths)
+            else:
+                widths = sample.astype(str).apply(lambda s: s.str.len().max()).to_numpy()
+                widths = np.maximum(widths, header_lengths)
+            widths = np.clip(widths + 2, None, 50)
+            for idx, width in enumerate(widths):
+                worksheet.set_column(idx, idx, int(width))
+
+            # Stream rows ourselves with a typed writer chosen once per
+            # column, instead of letting to_excel sniff the type of every
+            # cell. constant_memory requires row order, so the dispatch
+            # list is prebuilt and rows go out sequentially.
+            header_format = workbook.add_format({'bold': True})
+            for col_idx, name in enumerate(df.columns):
+                worksheet.write_string(2, col_idx, str(name), header_format)
+
+            datetime_format = None
+            col_kinds = []
+            for name in df.columns:
+                dtype = df[name].dtype
+                if pd.api.types.is_datetime64_any_dtype(dtype):
+                    if datetime_format is None:
+                        datetime_format = workbook.add_format(
+                            {'num_format': 'yyyy-mm-dd hh:mm:ss'})
+                    col_kinds.append('datetime')
+                elif (pd.api.types.is_numeric_dtype(dtype)
+                        and not pd.api.types.is_bool_dtype(dtype)):
+                    col_kinds.append('number')
+                else:
+                    col_kinds.append('string')
+
+            write_number = worksheet.write_number
+            write_string = worksheet.write_string
+            write_datetime = worksheet.write_datetime
+
+            def _stream_rows():
+                for row_idx, row in enumerate(df.itertuples(index=False, name=None), start=3):
+                    for col_idx, value in enumerate(row):
+                        if value is None or pd.isna(value):
+                            continue
+                        kind = col_kinds[col_idx]
+                        if kind == 'number':
+                            write_number(row_idx, col_idx, value)
+                        elif kind == 'datetime':
+                            write_datetime(row_idx, col_idx, value, datetime_format)
+                        else:
+                            write_string(row_idx, col_idx, str(value))
+
+            summary_df = None
+            if self._datacenter_count(df) > 1:
+                if len(df) >= 5000:
+                    # Overlap the summary groupby with the row stream: the
+                    # worker alone touches the workbook until it finishes,
+                    # the main thread only builds the summary frame
+                    with ThreadPoolExecutor(max_workers=1) as pool:
+                        stream_future = pool.submit(_stream_rows)
+                        summary_df = self._build_summary(df)
+                        stream_future.result()
+                else:
+                    _stream_rows()
+                    summary_df = self._build_summary(df)
+            else:
+                _stream_rows()
+
             # Add summary sheet if multiple datacenters
-            datacenters = export_data.data['Source_Datacenter'].nunique()
-            if datacenters > 1:
-                summary_data = []
-                for dc in export_data.data['Source_Datacenter'].unique():
-                    dc_data = export_data.data[export_data.data['Source_Datacenter'] == dc]
-                    for db_type in dc_data['Database_Type'].unique():
-                        db_data = dc_data[dc_data['Database_Type'] == db_type]
-                        summary_data.append({
-                            'Datacenter': dc,
-                            'Database_Type': db_type,
-                            'Record_Count': len(db_data),
-                            'Unique_Servers': db_data['hostname'].nunique() if 'hostname' in db_data.columns else 'N/A'
-                        })
-                
-                summary_df = pd.DataFrame(summary_data)
+            if summary_df is not None:
+                summary_ws = workbook.add_worksheet('Summary')
+                writer.sheets['Summary'] = summary_ws
+                summary_ws.write(0, 0, 'Query Results Summary', title_format)
                 summary_df.to_excel(writer, sheet_name='Summary', index=False, startrow=1)
-                
-                # Format summary sheet
-                summary_ws = writer.sheets['Summary']
-                summary_ws['A1'] = 'Query Results Summary'
-                summary_ws['A1'].font = summary_ws['A1'].font.copy(bold=True, size=14)
-        
-        buffer.seek(0)
-        return buffer.getvalue()
+
+        # Drop any pre-grown slack beyond what the writer actually produced,
+        # then snapshot once - the live buffer never leaves the exporter
+        buffer.truncate(buffer.tell())
+        return bytes(buffer.getbuffer())
     
-    def create_streamlit_export_component(self, export_data: ExcelExportData, excel_bytes: bytes) -> str:
+    def create_parquet_file(self, export_data: ExcelExportData) -> bytes:
+        """Serialize the full combined frame as zstd-compressed Parquet."""
+        parquet_buf = io.BytesIO()
+        export_data.data.to_parquet(parquet_buf, compression='zstd', engine='pyarrow')
+        return parquet_buf.getvalue()
+
+    def create_streamlit_export_component(self, export_data: ExcelExportData,
+                                          excel_bytes: bytes,
+                                          parquet_bytes: Optional[bytes] = None) -> str:
         """
         Create Streamlit-native Excel export component that works entirely in memory
 
         """
-        # Store data in Streamlit session state for in-memory handling
-        component_id = f"excel_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        
-        # Initialize session state if needed
-        try:
-            if 'excel_exports' not in st.session_state:
-                st.session_state.excel_exports = {}
-            
-            st.session_state.excel_exports[component_id] = {
-                'data': excel_bytes,
-                'filename': export_data.filename,
-                'total_rows': export_data.total_rows,
-                'file_size': len(excel_bytes)
-            }
-            
-            print(f"[DEBUG Excel] Stored export data with component_id: {component_id}")
-            print(f"[DEBUG Excel] Session state keys: {list(st.session_state.excel_exports.keys()) if hasattr(st.session_state, 'excel_exports') else 'No excel_exports'}")
-            
-        except Exception as e:
-            print(f"[DEBUG Excel] Session state storage failed: {e}")
-            # Fallback to instance storage
-            self.temp_files[component_id] = {
-                'data': excel_bytes,
-                'filename': export_data.filename,
-                'total_rows': export_data.total_rows,
-                'file_size': len(excel_bytes)
-            }
-            print(f"[DEBUG Excel] Used fallback temp_files storage")
-        
+        return self.store_export_payload(
+            self._make_export_info(export_data, excel_bytes, parquet_bytes))
+
+    def _make_export_info(self, export_data: ExcelExportData, excel_bytes: bytes,
+                          parquet_bytes: Optional[bytes] = None) -> Dict[str, Any]:
+        """Bundle the serialized files plus render metadata into one dict.
+
+        Computed once at export time; the render path used to re-derive
+        this from last_query_results on every rerun.
+        """
+        export_info = {
+            'data': excel_bytes,
+            'filename': export_data.filename,
+            'total_rows': export_data.total_rows,
+            'file_size': len(excel_bytes),
+            'db_types_count': int(export_data.data['Database_Type'].nunique())
+        }
+        if parquet_bytes is not None:
+            export_info['parquet'] = parquet_bytes
+            export_info['parquet_filename'] = export_data.filename.replace('.xlsx', '.parquet')
+        return export_info
+
+    def store_export_payload(self, export_info: Dict[str, Any]) -> str:
+        """Store an export payload in the *current* session and return its id.
+
+        Kept separate from the payload build so the expensive half can be
+        memoized process-wide while the id always resolves against the
+        session that is about to render it.
+        """
+        # uuid keys can't collide the way second-resolution timestamps did
+        component_id = f"excel_export_{uuid.uuid4().hex}"
+
+        # Session state is always available inside a Streamlit script run;
+        # exports live in exactly one place
+        store = st.session_state.setdefault('excel_exports', {})
+        while len(store) >= _MAX_STORED_EXPORTS:
+            store.pop(next(iter(store)))
+        store[component_id] = export_info
+        log.debug("Stored export data with component_id: %s", component_id)
+
         return component_id
     
     def render_excel_export_ui(self, component_id: str) -> None:
@@ -211,34 +459,20 @@ class ExcelExporter:
         Args:
             component_id: Component ID from create_streamlit_export_component
         """
-        export_info = None
-        
-        # Try session state first
-        if hasattr(st.session_state, 'excel_exports') and component_id in st.session_state.excel_exports:
-            export_info = st.session_state.excel_exports[component_id]
-            print(f"[DEBUG Excel UI] Found export in session state: {component_id}")
-        # Fallback to instance storage
-        elif component_id in self.temp_files:
-            export_info = self.temp_files[component_id]
-            print(f"[DEBUG Excel UI] Found export in temp_files: {component_id}")
-        else:
-            print(f"[DEBUG Excel UI] Export data not found for: {component_id}")
-            print(f"[DEBUG Excel UI] Available session keys: {list(st.session_state.excel_exports.keys()) if hasattr(st.session_state, 'excel_exports') else 'None'}")
-            print(f"[DEBUG Excel UI] Available temp_files keys: {list(self.temp_files.keys())}")
-            st.error(f"Excel export data not found for {component_id}")
+        export_info = st.session_state.get('excel_exports', {}).get(component_id)
+        if export_info is None:
+            # Only the most recent exports are kept per session, so ids in
+            # older chat messages outlive their payloads - expected in a
+            # long chat, not an error
+            log.debug("Export data evicted or missing for %s", component_id)
+            st.caption("📎 Excel export expired - re-ask the question to regenerate it")
             return
         
         # Create a container for the export UI with enhanced styling
         with st.container():
-            # Calculate database types count safely
-            db_types_count = 'multiple'
-            try:
-                if hasattr(st.session_state, 'last_query_results') and st.session_state.last_query_results:
-                    db_types = set([r.table_name.replace('_tb', '').upper() for r in st.session_state.last_query_results if r.success and r.data is not None and not r.data.empty])
-                    db_types_count = len(db_types)
-            except:
-                db_types_count = 'multiple'
-            
+            # Precomputed when the export was stored; renders are O(1)
+            db_types_count = export_info.get('db_types_count', 'multiple')
+
             # Simple text info without styling box
             st.markdown(f"📊 **Excel Export Ready**: {export_info['total_rows']} rows across {db_types_count} database types")
             
@@ -256,49 +490,71 @@ class ExcelExporter:
             
             with col2:
                 st.markdown(f"**{export_info['total_rows']}** rows • **{export_info['file_size']/1024:.1f}** KB")
+
+            if export_info.get('parquet') is not None:
+                st.download_button(
+                    label="📥 Full data (Parquet)",
+                    data=export_info['parquet'],
+                    file_name=export_info['parquet_filename'],
+                    mime="application/octet-stream",
+                    help="The Excel file holds a head/tail preview; this download contains every row"
+                )
     
-    def process_query_results_for_export(self, query_results: List, query_text: str = "") -> Optional[str]:
-        """
-        Process query results and create in-memory Excel export if needed
+    def build_export_payload(self, query_results: List, query_text: str = "") -> Optional[Dict[str, Any]]:
+        """Build the export payload (bytes + metadata) without touching session state.
+
+        Everything here depends only on the query results, so callers may
+        memoize it process-wide; storing the payload into a session is the
+        caller's (cheap) step via store_export_payload.
         """
-        print(f"[DEBUG Excel Process] Starting export process with {len(query_results)} results")
-        
+        log.debug("Starting export process with %d results", len(query_results))
+
         # Check if export is needed
         if not self.should_export_to_excel(query_results):
-            print(f"[DEBUG Excel Process] Export not needed - threshold not met")
+            log.debug("Export not needed - threshold not met")
             return None
-        
+
         try:
-            print(f"[DEBUG Excel Process] Preparing Excel data...")
             # Prepare data for Excel
             export_data = self.prepare_excel_data(query_results, query_text)
             if not export_data:
-                print(f"[DEBUG Excel Process] Export data preparation failed")
+                log.debug("Export data preparation failed")
                 return None
-            
-            print(f"[DEBUG Excel Process] Export data prepared: {export_data.total_rows} rows")
-            
+
             # Create Excel file in memory
-            print(f"[DEBUG Excel Process] Creating Excel file...")
             excel_bytes = self.create_excel_file(export_data)
-            print(f"[DEBUG Excel Process] Excel file created: {len(excel_bytes)} bytes")
-            
-            # Create Streamlit component
-            print(f"[DEBUG Excel Process] Creating Streamlit component...")
-            component_id = self.create_streamlit_export_component(export_data, excel_bytes)
-            print(f"[DEBUG Excel Process] Component created: {component_id}")
-            
-            return component_id
-            
+            log.debug("Excel file created: %d rows, %d bytes",
+                      export_data.total_rows, len(excel_bytes))
+
+            # Past the preview cap the workbook only holds head/tail rows,
+            # so ship the complete data alongside as Parquet. Degrades to
+            # preview-only when pyarrow is missing - an ImportError here
+            # would otherwise discard the already-built workbook too.
+            parquet_bytes = None
+            if export_data.total_rows > MAX_EXCEL_ROWS:
+                if _HAS_PYARROW:
+                    parquet_bytes = self.create_parquet_file(export_data)
+                else:
+                    log.debug("pyarrow not installed - skipping Parquet companion")
+
+            return self._make_export_info(export_data, excel_bytes, parquet_bytes)
+
         except Exception as e:
-            print(f"[DEBUG Excel Process] Exception in process_query_results_for_export: {str(e)}")
-            import traceback
-            print(f"[DEBUG Excel Process] Traceback: {traceback.format_exc()}")
+            log.exception("Excel export failed")
             try:
                 st.error(f"❌ Excel export failed: {str(e)}")
             except:
                 pass  # Don't fail if st.error fails
             return None
+
+    def process_query_results_for_export(self, query_results: List, query_text: str = "") -> Optional[str]:
+        """
+        Process query results and create in-memory Excel export if needed
+        """
+        export_info = self.build_export_payload(query_results, query_text)
+        if export_info is None:
+            return None
+        return self.store_export_payload(export_info)
     
     def render_in_chat_export(self, query_results: List, query_text: str = "") -> bool:
         """
@@ -314,18 +570,22 @@ class ExcelExporter:
         return True
 
 # Integration functions for the main application
+
+# Shared exporter: the free functions were instantiating (and discarding) a
+# fresh ExcelExporter per call
+_EXPORTER = ExcelExporter()
+
+
 def create_in_memory_excel_export(query_results: List, query_text: str = "") -> bool:
     """
     Create in-memory Excel export for chat integration
-    
+
     """
-    exporter = ExcelExporter()
-    return exporter.render_in_chat_export(query_results, query_text)
+    return _EXPORTER.render_in_chat_export(query_results, query_text)
 
 def should_show_excel_export(query_results: List) -> bool:
     """
     Check if Excel export should be shown for given query results
 
     """
-    exporter = ExcelExporter()
-    return exporter.should_export_to_excel(query_results)
+    return _EXPORTER.should_export_to_excel(query_results)
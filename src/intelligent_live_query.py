@@ -17,16 +17,35 @@ Flow:
 
 import os
 import json
+import logging
+import re
+import string
+import time
 import asyncio
+try:
+    # C-backed JSON parsing, 2-5x faster than stdlib for the LLM responses
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+import hashlib
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from dataclasses import dataclass
+from dataclasses import dataclass, field, fields
+from collections import Counter, OrderedDict
 from openai import OpenAI
+import numpy as np
 import pandas as pd
-import concurrent.futures
 from threading import Lock
+try:
+    # Optional at import time so validation tooling can load this module on
+    # machines without Streamlit; only the interface function requires it
+    import streamlit as st
+    _HAS_ST = True
+except ImportError:
+    _HAS_ST = False
 try:
     from env_helper import get_env_var, load_database_config
 except ImportError:
@@ -40,6 +59,35 @@ except ImportError:
     enhance_chat_response_with_graphs = None
     print("[WARNING] Graph visualization module not available")
 
+logger = logging.getLogger(__name__)
+
+# Compiled once; the planner strips these from every LLM response
+_FENCE_RE = re.compile(r'^```(?:json)?\s*|\s*```$', re.MULTILINE)
+_JSON_ARRAY_RE = re.compile(r'\[.*\]', re.DOTALL)
+
+# Hard ceiling on the results summary sent to the analysis LLM - oversized
+# prompts linearly inflate latency and token cost on wide fan-outs
+MAX_SUMMARY_CHARS = 16000
+
+# Summary-report line templates, prepared once at module load instead of
+# being rebuilt inside the per-result loop
+_ERROR_TPL = string.Template("  - ERROR: $err\n")
+_EMPTY_TPL = "  - No data returned (empty table)\n"
+
+
+def _numeric_values(rows: List[tuple], index: int) -> List[float]:
+    """Collect the float-parsable values of column *index* across rows"""
+    values = []
+    for r in rows:
+        v = r[index]
+        if v is None:
+            continue
+        try:
+            values.append(float(v))
+        except (TypeError, ValueError):
+            pass
+    return values
+
 @dataclass
 class QueryRequest:
     """Represents a query request from the LLM"""
@@ -49,17 +97,39 @@ class QueryRequest:
     reason: str  # Why this query is needed
     expected_result: str  # What we expect to find
 
+# Field names the planner must supply; any extra keys the LLM invents are
+# ignored instead of becoming a TypeError that empties the whole plan
+_QUERY_REQUEST_FIELDS = tuple(f.name for f in fields(QueryRequest))
+
 @dataclass
 class QueryResult:
-    """Result from executing queries"""
+    """Result from executing queries.
+
+    Rows are kept as the raw tuples the cursor returned, with column names
+    alongside - no per-row dict allocation. The DataFrame view is only
+    materialized when a consumer (e.g. the Excel exporter) actually asks
+    for `.data`, so the per-query hot path never pays for DataFrame
+    construction.
+    """
     server_name: str
     table_name: str
     sql: str
     success: bool
-    data: Optional[pd.DataFrame]
+    rows: Optional[List[tuple]]
     row_count: int
     execution_time: float
+    columns: Optional[List[str]] = None
     error: Optional[str] = None
+    _df: Optional[pd.DataFrame] = field(default=None, repr=False, compare=False)
+
+    @property
+    def data(self) -> Optional[pd.DataFrame]:
+        """DataFrame over the raw rows, built lazily and cached"""
+        if self.rows is None:
+            return None
+        if self._df is None:
+            self._df = pd.DataFrame(self.rows, columns=self.columns)
+        return self._df
 
 class IntelligentLiveQuerySystem:
     """
@@ -70,7 +140,78 @@ class IntelligentLiveQuerySystem:
         self.servers = self._load_server_configs()
         self.llm_client = self._init_llm_client()
         self.query_lock = Lock()
-        
+
+        # O(1) server lookup by canonical name or alias, instead of a linear
+        # scan per target name in every query plan
+        self._server_by_name = {s['name']: s for s in self.servers}
+        self._server_by_alias = {
+            a: s for s in self.servers for a in (s['aliases'] + [s['name'].lower()])
+        }
+
+        # Per-server connection pools, created lazily on first query so the
+        # TCP+TLS+auth handshake is paid once per server instead of once per
+        # (server, table, query) execution. Connection kwargs are rendered
+        # once here rather than rebuilt per query.
+        self._pools: Dict[str, ThreadedConnectionPool] = {}
+        self._conn_params: Dict[str, Dict[str, Any]] = {
+            s['name']: {
+                'host': s['host'],
+                'port': s['port'],
+                'dbname': s['database'],
+                'user': s['username'],
+                'password': s['password'],
+                'connect_timeout': 15,
+                'sslmode': 'prefer',
+                'application_name': 'smart_dba_bot',
+                # Server-side guard matching the old 30s client-side timeout
+                'options': '-c statement_timeout=30000',
+                # TCP keepalives: Streamlit Cloud NAT silently reaps idle
+                # pooled connections, which otherwise surfaces as "SSL
+                # SYSCALL error: EOF detected" on the first query after a
+                # quiet spell (same settings as debug_connection.py)
+                'keepalives': 1,
+                'keepalives_idle': 120,
+                'keepalives_interval': 10,
+                'keepalives_count': 3,
+            }
+            for s in self.servers
+        }
+
+        # Plan cache: repeated (or trivially rephrased) questions skip the
+        # gpt-4o-mini planner call entirely - the highest-latency step in
+        # answer_question. Keyed on a normalized question fingerprint, LRU
+        # bounded, and disableable via PLAN_CACHE_ENABLED=0
+        self._plan_cache: "OrderedDict[str, List[QueryRequest]]" = OrderedDict()
+        self._plan_cache_max = 512
+        self._plan_cache_enabled = os.getenv("PLAN_CACHE_ENABLED", "1") != "0"
+        # Semantic fallback: questions that miss the exact fingerprint cache
+        # but embed close to a past question (cosine >= 0.90) reuse its plan -
+        # one cheap embedding call instead of the full planner call
+        self._embed_cache: List[Tuple[np.ndarray, List[QueryRequest]]] = []
+        self._embed_cache_max = 1024
+        self._embed_similarity_threshold = 0.90
+        # Final-answer cache: identical questions over unchanged inventory
+        # data skip the analysis LLM call too. Short TTL tracks the
+        # data-extraction cadence.
+        self._answer_cache: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self._answer_cache_max = 256
+        self._answer_cache_ttl = 300.0
+        # Short-TTL cache of raw query results: the UI re-issues identical
+        # idempotent SELECTs within seconds during exploration, and the
+        # network round-trip is the whole cost
+        self._query_cache: Dict[Tuple[str, str, str], Tuple[float, QueryResult]] = {}
+        self._query_cache_ttl = 30.0
+        # Hard ceiling on rows fetched per query, so a LIMIT-less SQL from
+        # the planner can't materialize an entire table. 0 disables the cap.
+        self._max_result_rows = int(os.getenv("MAX_RESULT_ROWS", "50000"))
+        # Alias → canonical datacenter name, longest aliases first so
+        # "datacenter-4" wins over any shorter overlapping match
+        alias_map = {a: s['name'].lower() for s in self.servers for a in s['aliases']}
+        self._alias_map = alias_map
+        self._alias_re = re.compile(
+            '|'.join(re.escape(a) for a in sorted(alias_map, key=len, reverse=True))
+        ) if alias_map else None
+
         # Database schema information (cached for query generation)
         self.schema_cache = {}
         self._load_schema_cache()
@@ -148,51 +289,122 @@ class IntelligentLiveQuerySystem:
             ]
         }
         self.schema_cache = actual_schema
+
+        # The schema is static after this point, so the JSON encoding and
+        # the ~5 KB planner system prompt are built once here instead of on
+        # every question
+        self._schema_info_json = json.dumps(self.schema_cache, indent=2)
+        self._planner_system_prompt = self._build_planner_system_prompt()
     
-    async def answer_question(self, user_question: str) -> str:
+    async def answer_question(self, user_question: str) -> Tuple[str, List[QueryResult]]:
         """
         Main method: Answer user question by generating and executing live queries
+
+        Returns (response, query_results). Results go back to the caller
+        rather than onto a shared attribute - the system is a process-wide
+        singleton, and a shared slot would let one session's export read
+        another session's results.
         """
         try:
-            print(f"[DEBUG] Processing question: {user_question}")
-            
+            logger.debug("Processing question: %s", user_question)
+
             # Step 1: LLM analyzes question and generates query plan
             query_plan = await self._generate_query_plan(user_question)
-            
+
             if not query_plan:
-                return "❌ I couldn't understand your question. Please try rephrasing it."
-            
-            print(f"[DEBUG] Generated {len(query_plan)} queries")
-            
-            # Step 2: Execute queries across all relevant servers
-            query_results = await self._execute_queries(query_plan)
-            
-            print(f"[DEBUG] Executed queries, got {len(query_results)} results")
-            
-            # Store query results for potential graph generation
-            self._last_query_results = query_results
-            
+                return "❌ I couldn't understand your question. Please try rephrasing it.", []
+
+            logger.debug("Generated %d queries", len(query_plan))
+
+            # Step 2: Execute queries across all relevant servers, grouping
+            # results for the summary as each one arrives so that
+            # bookkeeping overlaps the slowest queries still in flight
+            query_results = []
+            results_by_server: Dict[str, Dict[str, List[QueryResult]]] = {}
+            async for result in self._iter_results(query_plan):
+                query_results.append(result)
+                results_by_server.setdefault(result.server_name, {}) \
+                    .setdefault(result.table_name, []).append(result)
+
+            logger.debug("Executed queries, got %d results", len(query_results))
+
+            # Same question against an unchanged result shape within the TTL:
+            # reuse the previous analysis instead of re-invoking the LLM
+            results_fp = hashlib.md5(json.dumps(sorted(
+                (r.server_name, r.table_name, r.row_count) for r in query_results
+            )).encode()).hexdigest()
+            cache_key = (self._fingerprint(user_question), results_fp)
+            cached_answer = self._answer_cache.get(cache_key)
+            if cached_answer is not None and time.time() - cached_answer[0] < self._answer_cache_ttl:
+                self._answer_cache.move_to_end(cache_key)
+                logger.debug("Answer cache hit")
+                return cached_answer[1], query_results
+
             # Step 3: LLM analyzes results and provides intelligent response
             final_response = await self._analyze_and_respond(
-                user_question, query_plan, query_results
+                user_question, query_plan, query_results, results_by_server
             )
-            
-            return final_response
-            
+
+            self._answer_cache[cache_key] = (time.time(), final_response)
+            while len(self._answer_cache) > self._answer_cache_max:
+                self._answer_cache.popitem(last=False)
+
+            return final_response, query_results
+
         except Exception as e:
-            return f"❌ Error processing your question: {str(e)}"
+            return f"❌ Error processing your question: {str(e)}", []
     
-    async def _generate_query_plan(self, user_question: str) -> List[QueryRequest]:
+    def _fingerprint(self, question: str) -> str:
+        """Normalize a question into a cache key.
+
+        Lowercases, maps datacenter aliases to canonical names and squeezes
+        whitespace, so "Servers down in datacenter-4" and "servers down in
+        DC4" share one plan-cache entry. Numeric literals are kept verbatim:
+        the planner bakes them into the SQL, so "top 10" and "top 7" must
+        not share a plan (or an answer).
         """
-        LLM generates SQL queries based on user question
+        fp = question.lower().strip()
+        if self._alias_re is not None:
+            fp = self._alias_re.sub(lambda m: self._alias_map[m.group(0)], fp)
+        return re.sub(r'\s+', ' ', fp)
+
+    async def _embed_question(self, question: str) -> Optional[np.ndarray]:
+        """Embed a question as a unit vector, or None if the call fails.
+
+        The synchronous OpenAI client runs in a worker thread so the network
+        round-trip doesn't block the event loop mid-fan-out.
         """
-        schema_info = json.dumps(self.schema_cache, indent=2)
-        
-        system_prompt = f"""
+        try:
+            response = await asyncio.to_thread(
+                self.llm_client.embeddings.create,
+                model="text-embedding-3-small",
+                input=question
+            )
+            vector = np.asarray(response.data[0].embedding, dtype=np.float64)
+            return vector / np.linalg.norm(vector)
+        except Exception as e:
+            logger.debug("Embedding call failed, skipping semantic cache: %s", e)
+            return None
+
+    def _semantic_plan_lookup(self, embedding: np.ndarray) -> Optional[List[QueryRequest]]:
+        """Return the plan of the most similar past question, if close enough"""
+        if not self._embed_cache:
+            return None
+        matrix = np.stack([vector for vector, _ in self._embed_cache])
+        similarities = matrix @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] >= self._embed_similarity_threshold:
+            logger.debug("Semantic plan cache hit (similarity=%.3f)", similarities[best])
+            return self._embed_cache[best][1]
+        return None
+
+    def _build_planner_system_prompt(self) -> str:
+        """Render the static system prompt for the SQL planner"""
+        return f"""
 You are an expert SQL query generator for database health monitoring systems.
 
 AVAILABLE DATABASES AND TABLES:
-{schema_info}
+{self._schema_info_json}
 
 AVAILABLE DATACENTERS:
 - DC4 (us01vlpgdd.saas-n.com) = HEALTH_CHECK_HOST_1 [PRIMARY - Most Active]
@@ -263,6 +475,30 @@ RESPONSE FORMAT (JSON):
 ]
 """
 
+    async def _generate_query_plan(self, user_question: str) -> List[QueryRequest]:
+        """
+        LLM generates SQL queries based on user question
+        """
+        fingerprint = self._fingerprint(user_question)
+        embedding = None
+        if self._plan_cache_enabled:
+            cached_plan = self._plan_cache.get(fingerprint)
+            if cached_plan is not None:
+                self._plan_cache.move_to_end(fingerprint)
+                logger.debug("Plan cache hit for: %.80s", fingerprint)
+                return cached_plan
+
+            # Exact miss - try a semantic match against past questions before
+            # paying for the planner call
+            embedding = await self._embed_question(user_question)
+            if embedding is not None:
+                cached_plan = self._semantic_plan_lookup(embedding)
+                if cached_plan is not None:
+                    return cached_plan
+
+        # Static prefix, prebuilt in _load_schema_cache
+        system_prompt = self._planner_system_prompt
+
         user_prompt = f"""
 Generate SQL queries to answer this question:
 "{user_question}"
@@ -271,7 +507,10 @@ Return only the JSON array, no other text.
 """
 
         try:
-            response = self.llm_client.chat.completions.create(
+            # The OpenAI client is synchronous; run it on a worker thread so
+            # awaiting here actually yields the event loop to other sessions
+            response = await asyncio.to_thread(
+                self.llm_client.chat.completions.create,
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -284,41 +523,34 @@ Return only the JSON array, no other text.
             response_text = response.choices[0].message.content.strip()
             print(f"[DEBUG] Full LLM response: {response_text}")  # Debug output
             
-            # Extract JSON from response - more robust parsing
-            if response_text.startswith('```json'):
-                response_text = response_text[7:]
-                if response_text.endswith('```'):
-                    response_text = response_text[:-3]
-            elif response_text.startswith('```'):
-                response_text = response_text[3:]
-                if response_text.endswith('```'):
-                    response_text = response_text[:-3]
-            
-            # Clean up the response text
-            response_text = response_text.strip()
-            
-            # Try to find JSON array if it's embedded in other text
-            import re
-            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
+            # Extract JSON from response - strip code fences, then pull the
+            # array out of any surrounding prose
+            response_text = _FENCE_RE.sub('', response_text).strip()
+            json_match = _JSON_ARRAY_RE.search(response_text)
             if json_match:
                 response_text = json_match.group(0)
-            
+
             print(f"[DEBUG] Cleaned JSON: {response_text[:200]}...")  # Debug output
-            
-            query_data = json.loads(response_text)
-            
-            # Convert to QueryRequest objects
-            query_requests = []
-            for q in query_data:
-                query_requests.append(QueryRequest(
-                    sql=q['sql'],
-                    target_tables=q['target_tables'],
-                    target_servers=q['target_servers'],
-                    reason=q['reason'],
-                    expected_result=q['expected_result']
-                ))
-            
+
+            query_data = _json_loads(response_text)
+
+            # Convert to QueryRequest objects, reading only the known fields
+            query_requests = [
+                QueryRequest(**{f: q[f] for f in _QUERY_REQUEST_FIELDS})
+                for q in query_data
+            ]
+
             print(f"[DEBUG] Successfully generated {len(query_requests)} query requests")
+
+            if self._plan_cache_enabled:
+                self._plan_cache[fingerprint] = query_requests
+                while len(self._plan_cache) > self._plan_cache_max:
+                    self._plan_cache.popitem(last=False)
+                if embedding is not None:
+                    self._embed_cache.append((embedding, query_requests))
+                    if len(self._embed_cache) > self._embed_cache_max:
+                        del self._embed_cache[0]
+
             return query_requests
             
         except Exception as e:
@@ -326,118 +558,223 @@ Return only the JSON array, no other text.
             print(f"[ERROR] Response text: {response_text if 'response_text' in locals() else 'No response text'}")
             return []
     
+    async def _iter_results(self, query_plan: List[QueryRequest]):
+        """
+        Yield QueryResults as each dispatch completes.
+
+        Fans out on the event loop instead of a fixed 8-worker thread pool,
+        so every (server, table) pair runs concurrently, and yields in
+        completion order so callers can overlap their own work (grouping,
+        summary assembly) with the slowest queries still in flight.
+        Overlapping QueryRequests that ask for the same (server, table, sql)
+        triple execute once, with the result yielded once per request.
+        """
+        dispatched: List = []
+        multiplicity: Counter = Counter()
+
+        async def _run(key, server, table_name, sql):
+            return key, await asyncio.to_thread(
+                self._execute_single_query, server, table_name, sql
+            )
+
+        for query_request in query_plan:
+            # Determine which servers to query
+            if "all" in query_request.target_servers:
+                target_servers = self.servers
+            else:
+                # Map datacenter names (or aliases) via the prebuilt lookups
+                target_servers = []
+                for target_name in query_request.target_servers:
+                    server = (self._server_by_name.get(target_name)
+                              or self._server_by_alias.get(target_name.lower()))
+                    if server is not None:
+                        target_servers.append(server)
+
+            # Create execution tasks
+            for server in target_servers:
+                for table_name in query_request.target_tables:
+                    key = (server['name'], table_name, query_request.sql)
+                    if key not in multiplicity:
+                        dispatched.append(_run(key, server, table_name, query_request.sql))
+                    multiplicity[key] += 1
+
+        for future in asyncio.as_completed(dispatched):
+            try:
+                key, result = await future
+            except Exception as e:
+                print(f"[ERROR] Query execution failed: {e}")
+                continue
+            # One QueryResult per originally requested pair, so downstream
+            # summary behavior is unchanged when duplicates were fused
+            for _ in range(multiplicity[key]):
+                yield result
+
     async def _execute_queries(self, query_plan: List[QueryRequest]) -> List[QueryResult]:
         """
         Execute queries across all relevant servers and tables
         """
-        all_results = []
-        
-        # Use thread pool for concurrent execution
-        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
-            futures = []
-            
-            for query_request in query_plan:
-                # Determine which servers to query
-                if query_request.target_servers == ["all"]:
-                    target_servers = self.servers
-                else:
-                    # Map datacenter names properly
-                    target_servers = []
-                    for target_name in query_request.target_servers:
-                        for server in self.servers:
-                            if server['name'] == target_name:
-                                target_servers.append(server)
-                                break
-                
-                # Create execution tasks
-                for server in target_servers:
-                    for table_name in query_request.target_tables:
-                        future = executor.submit(
-                            self._execute_single_query,
-                            server, table_name, query_request.sql
-                        )
-                        futures.append(future)
-            
-            # Collect results
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    result = future.result(timeout=30)  # 30 second timeout
-                    all_results.append(result)
-                except Exception as e:
-                    print(f"[ERROR] Query execution failed: {e}")
-        
-        return all_results
+        return [result async for result in self._iter_results(query_plan)]
     
+    def _get_pool(self, server: Dict) -> ThreadedConnectionPool:
+        """Return the connection pool for a server, creating it on first use"""
+        pool = self._pools.get(server['name'])
+        if pool is None:
+            with self.query_lock:
+                pool = self._pools.get(server['name'])
+                if pool is None:
+                    params = self._conn_params[server['name']]
+                    try:
+                        pool = ThreadedConnectionPool(minconn=2, maxconn=8, **params)
+                    except psycopg2.OperationalError as e:
+                        if 'ssl' not in str(e).lower():
+                            raise
+                        # SSL capability is probed exactly once, here at pool
+                        # creation; baking the answer into the cached params
+                        # means no query ever pays a failed-SSL round-trip
+                        params['sslmode'] = 'disable'
+                        logger.info("SSL unavailable for %s, using sslmode=disable",
+                                    server['name'])
+                        pool = ThreadedConnectionPool(minconn=2, maxconn=8, **params)
+                    self._pools[server['name']] = pool
+        return pool
+
     def _execute_single_query(self, server: Dict, table_name: str, sql: str) -> QueryResult:
         """
         Execute a single query on a specific server and table
         """
-        start_time = datetime.now()
-        
-        print(f"[DEBUG Query] Executing on {server['name']} ({server['host']}) - Table: {table_name}")
-        
-        try:
-            # Modify SQL to target specific table
-            modified_sql = sql.replace('{table}', table_name)
-            if 'FROM ' not in modified_sql.upper():
-                modified_sql = f"SELECT * FROM {table_name} WHERE " + modified_sql
-            
-            print(f"[DEBUG Query] SQL: {modified_sql[:100]}...")
-            
-            # Connect and execute
-            print(f"[DEBUG Query] Connecting to {server['host']}:{server['port']} as {server['username']}")
-            conn = psycopg2.connect(
-                host=server['host'],
-                port=server['port'],
-                dbname=server['database'],
-                user=server['username'],
-                password=server['password'],
-                connect_timeout=15
-            )
-            
-            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
-                cursor.execute(modified_sql)
-                rows = cursor.fetchall()
-                
-                # Convert to DataFrame
-                df = pd.DataFrame(rows) if rows else pd.DataFrame()
-                
-                execution_time = (datetime.now() - start_time).total_seconds()
-                
-                conn.close()
-                
+        # Serve a recent identical execution straight from the cache
+        cache_key = (server['name'], table_name, sql)
+        now = time.time()
+        with self.query_lock:
+            hit = self._query_cache.get(cache_key)
+        if hit is not None and now - hit[0] < self._query_cache_ttl:
+            return hit[1]
+
+        # perf_counter is monotonic and cheap - datetime.now() built two
+        # full datetime objects per query just to subtract them
+        start_time = time.perf_counter()
+
+        # %-style args only format when DEBUG is enabled, so production runs
+        # skip the string building entirely
+        logger.debug("Executing on %s (%s) - Table: %s",
+                     server['name'], server['host'], table_name)
+
+        conn = None
+        pool = None
+        # One retry on OperationalError: pooled connections go stale while
+        # idle (Streamlit Cloud's NAT reaps them - "SSL SYSCALL error: EOF
+        # detected"), and the first question after a quiet spell would
+        # otherwise fail where the old connection-per-query code never did.
+        # The broken connection is returned closed, so the second attempt
+        # starts from a fresh socket.
+        for attempt in (0, 1):
+            try:
+                # Modify SQL to target specific table
+                modified_sql = sql.replace('{table}', table_name)
+                if 'FROM ' not in modified_sql.upper():
+                    modified_sql = f"SELECT * FROM {table_name} WHERE " + modified_sql
+
+                logger.debug("SQL: %.100s...", modified_sql)
+
+                # Borrow an already-authenticated connection from the pool
+                pool = self._get_pool(server)
+                conn = pool.getconn()
+
+                # Server-side PREPARE keyed by SQL hash: the plan cache and the
+                # 4-datacenter fan-out re-issue identical SQL constantly, so
+                # repeated executions on a pooled connection skip the Postgres
+                # parse/plan step. The LLM renders SQL fully (no bind params),
+                # which makes the EXECUTE trivially safe here.
+                stmt_name = f"s_{hashlib.md5(modified_sql.encode()).hexdigest()[:12]}"
+                prepared = getattr(conn, '_prepared_stmts', None)
+                if prepared is None:
+                    prepared = set()
+                    conn._prepared_stmts = prepared
+
+                with conn.cursor() as cursor:
+                    if stmt_name not in prepared:
+                        cursor.execute(f"PREPARE {stmt_name} AS {modified_sql}")
+                        prepared.add(stmt_name)
+                    cursor.execute(f"EXECUTE {stmt_name}")
+                    colnames = [d.name for d in cursor.description]
+
+                    # Drain in batches instead of one fetchall so the row cap
+                    # can stop a LIMIT-less query early; peak memory is bounded
+                    # by the cap rather than the table size
+                    cursor.arraysize = 1000
+                    rows: List[tuple] = []
+                    limit = self._max_result_rows
+                    while True:
+                        batch = cursor.fetchmany()
+                        if not batch:
+                            break
+                        rows.extend(batch)
+                        if limit and len(rows) >= limit:
+                            del rows[limit:]
+                            logger.debug("Result truncated at %d rows (%s.%s)",
+                                         limit, server['name'], table_name)
+                            break
+
+                    execution_time = time.perf_counter() - start_time
+
+                    # Commit so the PREPARE survives the pool's rollback-on-return
+                    conn.commit()
+                    pool.putconn(conn)
+                    conn = None
+
+                    result = QueryResult(
+                        server_name=server['name'],
+                        table_name=table_name,
+                        sql=modified_sql,
+                        success=True,
+                        rows=rows,
+                        row_count=len(rows),
+                        execution_time=execution_time,
+                        columns=colnames
+                    )
+
+                    with self.query_lock:
+                        self._query_cache[cache_key] = (now, result)
+                        # Opportunistic eviction: examine a handful of entries
+                        # per call rather than sweeping the whole cache
+                        for k in list(self._query_cache)[:16]:
+                            if now - self._query_cache[k][0] > 2 * self._query_cache_ttl:
+                                del self._query_cache[k]
+
+                    return result
+
+            except Exception as e:
+                # A connection that raised may be mid-transaction or broken -
+                # return it to the pool closed so a fresh one replaces it
+                if conn is not None and pool is not None:
+                    pool.putconn(conn, close=True)
+                    conn = None
+                if attempt == 0 and isinstance(e, psycopg2.OperationalError):
+                    logger.debug("Retrying %s.%s on a fresh connection after: %s",
+                                 server['name'], table_name, e)
+                    continue
+                execution_time = time.perf_counter() - start_time
                 return QueryResult(
                     server_name=server['name'],
                     table_name=table_name,
-                    sql=modified_sql,
-                    success=True,
-                    data=df,
-                    row_count=len(df),
-                    execution_time=execution_time
+                    sql=sql,
+                    success=False,
+                    rows=None,
+                    row_count=0,
+                    execution_time=execution_time,
+                    error=str(e)
                 )
-                
-        except Exception as e:
-            execution_time = (datetime.now() - start_time).total_seconds()
-            return QueryResult(
-                server_name=server['name'],
-                table_name=table_name,
-                sql=sql,
-                success=False,
-                data=None,
-                row_count=0,
-                execution_time=execution_time,
-                error=str(e)
-            )
     
-    async def _analyze_and_respond(self, user_question: str, 
-                                   query_plan: List[QueryRequest], 
-                                   query_results: List[QueryResult]) -> str:
+    async def _analyze_and_respond(self, user_question: str,
+                                   query_plan: List[QueryRequest],
+                                   query_results: List[QueryResult],
+                                   results_by_server: Optional[Dict[str, Dict[str, List[QueryResult]]]] = None) -> str:
         """
         LLM analyzes query results and provides intelligent response
         """
-        
+
         # Prepare results summary for LLM
-        results_summary = self._prepare_results_summary(query_results)
+        results_summary = self._prepare_results_summary(query_results, results_by_server)
         
         system_prompt = """
 You are an expert Database Administrator providing crisp, focused analysis.
@@ -545,7 +882,10 @@ Please analyze these results and provide a comprehensive answer to the user's qu
 """
 
         try:
-            response = self.llm_client.chat.completions.create(
+            # Same as the planner: keep the blocking client call off the
+            # event loop
+            response = await asyncio.to_thread(
+                self.llm_client.chat.completions.create,
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -560,74 +900,92 @@ Please analyze these results and provide a comprehensive answer to the user's qu
         except Exception as e:
             return f"❌ Error analyzing results: {str(e)}"
     
-    def _prepare_results_summary(self, query_results: List[QueryResult]) -> str:
+    def _prepare_results_summary(self, query_results: List[QueryResult],
+                                 results_by_server: Optional[Dict[str, Dict[str, List[QueryResult]]]] = None) -> str:
         """
-        Prepare a summary of query results for LLM analysis
+        Prepare a summary of query results for LLM analysis.
+
+        Callers that already grouped results while streaming them in (see
+        answer_question) pass the grouping along; otherwise it is built here.
         """
-        summary = ""
-        
+        # Accumulate into a list and join once: repeated str += is O(N^2)
+        # in the number of appended sections
+        parts: List[str] = []
+        size = 0
+
+        def emit(s):
+            nonlocal size
+            parts.append(s)
+            size += len(s)
+
+        # Wide fan-outs (16+ queries) get smaller per-query samples so the
+        # prompt stays bounded
+        sample_size = 2 if len(query_results) > 20 else 5
+
         # Group results by server and table
-        results_by_server = {}
-        for result in query_results:
-            if result.server_name not in results_by_server:
-                results_by_server[result.server_name] = {}
-            if result.table_name not in results_by_server[result.server_name]:
-                results_by_server[result.server_name][result.table_name] = []
-            results_by_server[result.server_name][result.table_name].append(result)
+        if results_by_server is None:
+            results_by_server = {}
+            for result in query_results:
+                results_by_server.setdefault(result.server_name, {}) \
+                    .setdefault(result.table_name, []).append(result)
         
         for server_name, tables in results_by_server.items():
-            summary += f"\n=== {server_name} ===\n"
-            
+            emit(f"\n=== {server_name} ===\n")
+
             for table_name, results in tables.items():
-                summary += f"\n{table_name}:\n"
-                
+                emit(f"\n{table_name}:\n")
+
                 for result in results:
-                    if result.success and result.data is not None and not result.data.empty:
-                        # Include key statistics
-                        df = result.data
-                        summary += f"  - Records: {len(df)}\n"
-                        
-                        # Include sample of actual data (first few rows)
-                        if len(df) > 0:
-                            summary += f"  - Sample data:\n"
-                            sample_df = df.head(5)
-                            for _, row in sample_df.iterrows():
-                                row_str = ", ".join([f"{k}={v}" for k, v in row.items() if pd.notna(v)])
-                                summary += f"    {row_str}\n"
-                        
+                    if result.success and result.rows:
+                        # Include key statistics - straight off the raw row
+                        # tuples; dicts are only built for the sample rows
+                        rows = result.rows
+                        colnames = result.columns or []
+                        col_index = {c: i for i, c in enumerate(colnames)}
+                        emit(f"  - Records: {len(rows)}\n")
+
+                        # Include sample of actual data (first few rows),
+                        # unless the summary already hit its size cap
+                        if size < MAX_SUMMARY_CHARS:
+                            emit(f"  - Sample data:\n")
+                            for row in rows[:sample_size]:
+                                row_str = ", ".join(
+                                    f"{k}={v}" for k, v in zip(colnames, row)
+                                    if v is not None and v == v  # v != v filters NaN
+                                )
+                                emit(f"    {row_str}\n")
+                        else:
+                            emit(f"  - ... {len(rows)} sample rows elided (summary size cap)\n")
+
                         # Include key aggregations if relevant columns exist
-                        if 'database_status' in df.columns:
-                            status_counts = df['database_status'].value_counts()
-                            summary += f"  - Status distribution: {status_counts.to_dict()}\n"
-                        
-                        if 'database_size' in df.columns:
-                            # Handle database_size which might be in different formats
-                            try:
-                                df['size_numeric'] = pd.to_numeric(df['database_size'], errors='coerce')
-                                valid_sizes = df['size_numeric'].dropna()
-                                if len(valid_sizes) > 0:
-                                    total_size = valid_sizes.sum()
-                                    avg_size = valid_sizes.mean()
-                                    summary += f"  - Total size: {total_size:.2f} GB, Average: {avg_size:.2f} GB\n"
-                            except:
-                                summary += f"  - Database sizes available but format varies\n"
-                        
-                        if 'ram' in df.columns:
-                            try:
-                                df['ram_numeric'] = pd.to_numeric(df['ram'], errors='coerce')
-                                valid_ram = df['ram_numeric'].dropna()
-                                if len(valid_ram) > 0:
-                                    avg_ram = valid_ram.mean()
-                                    summary += f"  - Average RAM: {avg_ram:.2f} GB\n"
-                            except:
-                                pass
-                    
+                        status_idx = col_index.get('database_status')
+                        if status_idx is not None:
+                            status_counts = Counter(
+                                r[status_idx] for r in rows
+                                if r[status_idx] is not None
+                            )
+                            emit(f"  - Status distribution: {dict(status_counts)}\n")
+
+                        size_idx = col_index.get('database_size')
+                        if size_idx is not None:
+                            valid_sizes = _numeric_values(rows, size_idx)
+                            if valid_sizes:
+                                total_size = sum(valid_sizes)
+                                emit(f"  - Total size: {total_size:.2f} GB, "
+                                     f"Average: {total_size / len(valid_sizes):.2f} GB\n")
+
+                        ram_idx = col_index.get('ram')
+                        if ram_idx is not None:
+                            valid_ram = _numeric_values(rows, ram_idx)
+                            if valid_ram:
+                                emit(f"  - Average RAM: {sum(valid_ram) / len(valid_ram):.2f} GB\n")
+
                     elif not result.success:
-                        summary += f"  - ERROR: {result.error}\n"
+                        emit(_ERROR_TPL.substitute(err=result.error))
                     else:
-                        summary += f"  - No data returned (empty table)\n"
-        
-        return summary
+                        emit(_EMPTY_TPL)
+
+        return "".join(parts)
 
 # Usage example and integration
 class LiveQueryChatbot:
@@ -637,34 +995,78 @@ class LiveQueryChatbot:
     
     def __init__(self):
         self.query_system = IntelligentLiveQuerySystem()
-    
-    async def chat(self, question: str) -> str:
+        # Rendered-response cache keyed on the full normalized question, so
+        # repeated dashboard questions - notably the canned quick-action
+        # buttons, which send identical strings every click - skip the
+        # entire LLM + database pipeline. LRU-bounded like the caches in
+        # IntelligentLiveQuerySystem; error responses are never stored.
+        self._response_cache: "OrderedDict[str, Tuple[float, str, List[QueryResult]]]" = OrderedDict()
+        self._response_cache_max = 128
+        self._response_cache_ttl = 300.0
+
+    async def chat(self, question: str) -> Tuple[str, List[QueryResult]]:
         """
         Main chat interface with progress tracking
+
+        Returns (response, query_results) so callers can build exports from
+        the results that actually produced this answer.
         """
-        print(f"🤖 Step 1/4: Analyzing your question...")
-        print(f"🤖 Step 2/4: Generating SQL queries...")
-        print(f"🤖 Step 3/4: Querying live databases...")
-        print(f"🤖 Step 4/4: Analyzing results and generating response...")
-        
-        response = await self.query_system.answer_question(question)
-        
-        return response
+        cache_key = re.sub(r'\s+', ' ', question.lower().strip())
+        hit = self._response_cache.get(cache_key)
+        if hit is not None and time.time() - hit[0] < self._response_cache_ttl:
+            self._response_cache.move_to_end(cache_key)
+            # The results are cached alongside the response: a hit must hand
+            # back its own result set, not whatever ran last
+            return hit[1], hit[2]
+
+        # debug-level so production runs skip the stdout round-trip (and
+        # Streamlit Cloud's log-capture pipe) on every question
+        logger.debug("🤖 Step 1/4: Analyzing your question...")
+        logger.debug("🤖 Step 2/4: Generating SQL queries...")
+        logger.debug("🤖 Step 3/4: Querying live databases...")
+        logger.debug("🤖 Step 4/4: Analyzing results and generating response...")
+
+        response, query_results = await self.query_system.answer_question(question)
+
+        # Never cache failures: a transient DB/LLM outage would otherwise be
+        # re-served for the full TTL after the underlying issue resolves
+        if not response.startswith("❌"):
+            self._response_cache[cache_key] = (time.time(), response, query_results)
+            while len(self._response_cache) > self._response_cache_max:
+                self._response_cache.popitem(last=False)
+        return response, query_results
 
 # Integration with existing Streamlit app
 def create_live_query_interface():
     """
     Create Streamlit interface for live queries
     """
-    import streamlit as st
-    import asyncio
-    
+    if not _HAS_ST:
+        raise RuntimeError("streamlit is required for the live query interface")
+
     st.title("🔍 Live Database Query Assistant")
     st.markdown("Ask questions and I'll query the live databases for you!")
-    
-    if "live_chatbot" not in st.session_state:
-        st.session_state.live_chatbot = LiveQueryChatbot()
-    
+
+    # Resource-cached chatbot: one instance for the whole server process,
+    # so new tabs reuse the warm connection pools and LLM client instead of
+    # paying cold-start per session
+    @st.cache_resource
+    def _get_chatbot():
+        return LiveQueryChatbot()
+
+    # One loop per session instead of a fresh one per click: asyncio.run
+    # tears down the loop each time, which would discard the warm connection
+    # pools and LLM keep-alives the query system holds
+    if "loop" not in st.session_state:
+        st.session_state.loop = asyncio.new_event_loop()
+
+    # Repeat clicks are served by the chatbot's own response cache, which
+    # (unlike st.cache_data here) skips error responses instead of pinning
+    # them for the whole TTL
+    def _answer(question: str) -> str:
+        response, _ = st.session_state.loop.run_until_complete(_get_chatbot().chat(question))
+        return response
+
     # Quick action buttons
     st.markdown("### 🚀 Quick Questions")
     col1, col2, col3 = st.columns(3)
@@ -673,21 +1075,21 @@ def create_live_query_interface():
         if st.button("📊 Overall Health Status"):
             question = "Show me the overall health status of all databases across all datacenters"
             with st.spinner("Querying live databases..."):
-                response = asyncio.run(st.session_state.live_chatbot.chat(question))
+                response = _answer(question)
             st.markdown(response)
     
     with col2:
         if st.button("🚨 Critical Issues"):
             question = "Show me all databases with critical issues like low disk space or backup failures"
             with st.spinner("Querying live databases..."):
-                response = asyncio.run(st.session_state.live_chatbot.chat(question))
+                response = _answer(question)
             st.markdown(response)
     
     with col3:
         if st.button("💾 Storage Analysis"):
             question = "Analyze database storage usage and show the largest databases"
             with st.spinner("Querying live databases..."):
-                response = asyncio.run(st.session_state.live_chatbot.chat(question))
+                response = _answer(question)
             st.markdown(response)
     
     # Custom question input
@@ -700,7 +1102,7 @@ def create_live_query_interface():
     if st.button("🔍 Query Databases", type="primary"):
         if user_question.strip():
             with st.spinner("Analyzing question and querying live databases..."):
-                response = asyncio.run(st.session_state.live_chatbot.chat(user_question))
+                response = _answer(user_question)
             
             st.markdown("### 📊 Results")
             st.markdown(response)
@@ -708,24 +1110,45 @@ def create_live_query_interface():
             st.warning("Please enter a question first!")
 
 if __name__ == "__main__":
+    # Keep the step/progress lines visible when running the test driver
+    logging.basicConfig(level=logging.DEBUG)
+
+    # libuv-backed event loop when available - a consistent win on
+    # network-heavy asyncio workloads like this fan-out
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
     # Test the system
     async def test_system():
         chatbot = LiveQueryChatbot()
-        
+
         test_questions = [
             "Show me all databases that are currently down",
             "What are the largest Oracle databases across all datacenters?",
             "Show me backup failures in the last 24 hours",
             "Which servers have less than 10% free disk space?"
         ]
-        
-        for question in test_questions:
+
+        # The questions are independent, but an unbounded gather front-loads
+        # every LLM + database round-trip at once and prints nothing until
+        # the slowest finishes. Cap concurrency at two and stream each
+        # answer as soon as it completes.
+        sem = asyncio.Semaphore(2)
+
+        async def run(question):
+            async with sem:
+                response, _ = await chatbot.chat(question)
+                return question, response
+
+        for future in asyncio.as_completed([run(q) for q in test_questions]):
+            question, response = await future
             print(f"\n{'='*60}")
             print(f"Q: {question}")
             print('='*60)
-            
-            response = await chatbot.chat(question)
             print(response)
-    
+
     # Run test
     asyncio.run(test_system())